@@ -4,17 +4,16 @@ Virtual Lifter — Streamlit Front-End
 A polished UI that wraps the Bayesian Network from prob-interface.py.
 Users enter their lifestyle inputs (Sleep, Macros, TimeRest) and
 the app performs probabilistic inference to recommend a workout plan.
+Posteriors are served from the table precompiled by posterior_table.py,
+so no inference (and no pgmpy) runs per interaction; cards and the
+breakdown are rendered once per input combination and cached.
 
 Run with:  python -m streamlit run app.py
 """
 
 import streamlit as st
-import numpy as np
-from pgmpy.inference import VariableElimination
 
-# Import the model builder from the refactored prob-interface module
-import importlib
-prob_interface = importlib.import_module("prob-interface")
+import posterior_table
 
 # ──────────────────────────────────────────────
 # PAGE CONFIG & STYLING
@@ -109,16 +108,15 @@ html, body, [class*="st-"] {
 
 
 # ──────────────────────────────────────────────
-# BUILD MODEL (cached — only runs once)
+# LOAD POSTERIOR TABLE (cached — only runs once)
 # ──────────────────────────────────────────────
 @st.cache_resource
-def get_model_and_inference():
-    """Build the BN model and inference engine once, then cache."""
-    model = prob_interface.build_model()
-    return model, VariableElimination(model)
+def get_posterior_table():
+    """Load the precompiled posterior table once (compiling it if missing)."""
+    return posterior_table.load_or_compile()
 
 
-model, inference_engine = get_model_and_inference()
+table = get_posterior_table()
 
 # ──────────────────────────────────────────────
 # HEADER
@@ -159,29 +157,19 @@ with col3:
     )
 
 # ──────────────────────────────────────────────
-# INFERENCE
+# INFERENCE + RENDERING (cached per input combination)
 # ──────────────────────────────────────────────
-evidence = {
-    'Sleep': sleep,
-    'Macros': macros,
-    'TimeRest': time_rest,
-}
+# Results and the finished HTML are cached per (sleep, macros, time_rest)
+# and the hash of the model the table was compiled from, so a recompiled
+# table never serves old entries. The cache is shared by every session on
+# the server; max_entries bounds the memory with least-recently-used
+# eviction.
+CACHE_ENTRIES = 64
 
 query_vars = ['Recovery', 'Fatigue', 'Readiness', 'Risk',
               'Soreness', 'Weight', 'Volume', 'RPE']
 
-results = {}
-for var in query_vars:
-    posterior = inference_engine.query([var], evidence=evidence)
-    states = posterior.state_names[var]
-    probs = posterior.values
-    best_idx = int(np.argmax(probs))
-    results[var] = {
-        'best_state': states[best_idx],
-        'best_prob': float(probs[best_idx]),
-        'all_states': states,
-        'all_probs': [float(p) for p in probs],
-    }
+RISK_CLASS = {'Low': 'risk-low', 'Elevated': 'risk-elevated', 'Critical': 'risk-critical'}
 
 
 def render_metric_card(label, value, prob, extra_class=""):
@@ -199,6 +187,78 @@ def render_metric_card(label, value, prob, extra_class=""):
     """
 
 
+def render_workout_card(label, var, results, workout):
+    """Card for one variable of the joint recommendation (marginal confidence)."""
+    state = workout['assignment'][var]
+    r = results[var]
+    return render_metric_card(label, state, r['all_probs'][r['all_states'].index(state)])
+
+
+def render_breakdown_row(state, prob, best):
+    """One state of the breakdown: name, probability bar and percentage."""
+    bar_pct = int(prob * 100)
+    marker = " ◀" if best else ""
+    return (
+        f'<div style="display:flex;align-items:center;gap:8px;margin-bottom:4px;">'
+        f'<span style="min-width:180px;color:#cbd5e1;font-size:0.85rem;">{state}{marker}</span>'
+        f'<div style="flex:1;background:#1e1b4b;border-radius:6px;height:8px;overflow:hidden;">'
+        f'<div style="width:{bar_pct}%;height:8px;border-radius:6px;'
+        f'background:linear-gradient(90deg,#6366f1,#a855f7);"></div></div>'
+        f'<span style="min-width:45px;text-align:right;color:#818cf8;font-size:0.82rem;">{prob:.0%}</span>'
+        f'</div>'
+    )
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def render_view(sleep, macros, time_rest, model_hash):
+    """Posteriors and pre-rendered card HTML for one input combination."""
+    evidence = {'Sleep': sleep, 'Macros': macros, 'TimeRest': time_rest}
+    results = posterior_table.lookup(table, evidence)
+    workout = posterior_table.lookup_workout(table, evidence)
+
+    def card(label, var, extra_class=""):
+        return render_metric_card(label, results[var]['best_state'],
+                                  results[var]['best_prob'], extra_class)
+
+    risk_val = results['Risk']['best_state']
+    # Weight, Volume and RPE come from the single most probable joint
+    # combination, so the three never contradict each other.
+    cards = {
+        'Recovery': card("Recovery", 'Recovery'),
+        'Fatigue':  card("Fatigue", 'Fatigue'),
+        'Readiness': card("Readiness", 'Readiness'),
+        'Risk':     card("Injury Risk", 'Risk', RISK_CLASS.get(risk_val, '')),
+        'Weight':   render_workout_card("Weight / Load", 'Weight', results, workout),
+        'Volume':   render_workout_card("Volume", 'Volume', results, workout),
+        'RPE':      render_workout_card("Expected RPE", 'RPE', results, workout),
+        'Soreness': card("Soreness", 'Soreness'),
+    }
+    return {
+        'results': results,
+        'workout': workout,
+        'cards': cards,
+        'caption': (f"Most probable Weight / Volume / RPE combination · "
+                    f"{workout['probability']:.0%} joint probability"),
+    }
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def render_breakdown(sleep, macros, time_rest, model_hash):
+    """HTML of the full probability breakdown, built in a single pass."""
+    results = render_view(sleep, macros, time_rest, model_hash)['results']
+    parts = []
+    for var in query_vars:
+        r = results[var]
+        parts.append(f'<p style="font-weight:700;margin:0 0 6px 0;">{var}</p>')
+        parts.extend(render_breakdown_row(state, prob, state == r['best_state'])
+                     for state, prob in zip(r['all_states'], r['all_probs']))
+        parts.append("<div style='height:12px'></div>")
+    return "".join(parts)
+
+
+view = render_view(sleep, macros, time_rest, table['hash'])
+
+
 # ──────────────────────────────────────────────
 # BODY STATUS SECTION
 # ──────────────────────────────────────────────
@@ -207,33 +267,9 @@ st.markdown("### 🧠 Inferred Body Status")
 
 bc1, bc2, bc3, bc4 = st.columns(4)
 
-with bc1:
-    st.markdown(render_metric_card(
-        "Recovery", results['Recovery']['best_state'],
-        results['Recovery']['best_prob']
-    ), unsafe_allow_html=True)
-
-with bc2:
-    st.markdown(render_metric_card(
-        "Fatigue", results['Fatigue']['best_state'],
-        results['Fatigue']['best_prob']
-    ), unsafe_allow_html=True)
-
-with bc3:
-    st.markdown(render_metric_card(
-        "Readiness", results['Readiness']['best_state'],
-        results['Readiness']['best_prob']
-    ), unsafe_allow_html=True)
-
-with bc4:
-    risk_val = results['Risk']['best_state']
-    risk_class = {
-        'Low': 'risk-low', 'Elevated': 'risk-elevated', 'Critical': 'risk-critical'
-    }.get(risk_val, '')
-    st.markdown(render_metric_card(
-        "Injury Risk", risk_val,
-        results['Risk']['best_prob'], extra_class=risk_class
-    ), unsafe_allow_html=True)
+for col, var in zip((bc1, bc2, bc3, bc4), ('Recovery', 'Fatigue', 'Readiness', 'Risk')):
+    with col:
+        st.markdown(view['cards'][var], unsafe_allow_html=True)
 
 
 # ──────────────────────────────────────────────
@@ -244,29 +280,11 @@ st.markdown("### 💪 Recommended Workout")
 
 wc1, wc2, wc3, wc4 = st.columns(4)
 
-with wc1:
-    st.markdown(render_metric_card(
-        "Weight / Load", results['Weight']['best_state'],
-        results['Weight']['best_prob']
-    ), unsafe_allow_html=True)
-
-with wc2:
-    st.markdown(render_metric_card(
-        "Volume", results['Volume']['best_state'],
-        results['Volume']['best_prob']
-    ), unsafe_allow_html=True)
-
-with wc3:
-    st.markdown(render_metric_card(
-        "Expected RPE", results['RPE']['best_state'],
-        results['RPE']['best_prob']
-    ), unsafe_allow_html=True)
+for col, var in zip((wc1, wc2, wc3, wc4), ('Weight', 'Volume', 'RPE', 'Soreness')):
+    with col:
+        st.markdown(view['cards'][var], unsafe_allow_html=True)
 
-with wc4:
-    st.markdown(render_metric_card(
-        "Soreness", results['Soreness']['best_state'],
-        results['Soreness']['best_prob']
-    ), unsafe_allow_html=True)
+st.caption(view['caption'])
 
 
 # ──────────────────────────────────────────────
@@ -274,24 +292,13 @@ with wc4:
 # ──────────────────────────────────────────────
 st.markdown("---")
 
-with st.expander("📊 Full Probability Breakdown", expanded=False):
-    for var in query_vars:
-        st.markdown(f"**{var}**")
-        r = results[var]
-        for state, prob in zip(r['all_states'], r['all_probs']):
-            bar_pct = int(prob * 100)
-            marker = " ◀" if state == r['best_state'] else ""
-            st.markdown(
-                f'<div style="display:flex;align-items:center;gap:8px;margin-bottom:4px;">'
-                f'<span style="min-width:180px;color:#cbd5e1;font-size:0.85rem;">{state}{marker}</span>'
-                f'<div style="flex:1;background:#1e1b4b;border-radius:6px;height:8px;overflow:hidden;">'
-                f'<div style="width:{bar_pct}%;height:8px;border-radius:6px;'
-                f'background:linear-gradient(90deg,#6366f1,#a855f7);"></div></div>'
-                f'<span style="min-width:45px;text-align:right;color:#818cf8;font-size:0.82rem;">{prob:.0%}</span>'
-                f'</div>',
-                unsafe_allow_html=True,
-            )
-        st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
+# on_change="rerun" makes the expander report whether it is open, so the
+# breakdown is only built (and sent) once the user opens it.
+breakdown = st.expander("📊 Full Probability Breakdown", expanded=False,
+                        key="breakdown", on_change="rerun")
+if breakdown.open:
+    with breakdown:
+        st.markdown(render_breakdown(sleep, macros, time_rest, table['hash']), unsafe_allow_html=True)
 
 
 # ──────────────────────────────────────────────
@@ -0,0 +1,181 @@
+"""
+Virtual Lifter: Batched Posterior Inference
+-------------------------------------------
+Posterior marginals for many evidence rows at once, e.g. every logged
+session in synthetic_lifting_logs.csv with its observed Soreness, RPE or
+Weight.
+
+Each row may observe any subset of the 11 variables. Evidence enters the
+contraction as a likelihood factor of shape (batch, card) - one-hot where a
+row observed the variable, all ones where it did not - so one einsum pass
+handles the whole batch whatever mix of observed and missing values it has.
+
+For each query variable the order in which the other variables are summed
+out is fixed when the engine is built: a dynamic programme over subsets of
+eliminated variables finds the order minimising the total size of the
+intermediate factors, which for 11 nodes is exact and cheap. Every step of
+the contraction is then one np.einsum over the factors that mention the
+eliminated variable (pairwise-optimised, since those factors carry the
+batch axis).
+
+Dependencies:
+    pip install numpy
+"""
+
+import math
+
+import numpy as np
+
+import bn_arrays
+from bn_arrays import MISSING
+
+
+class BatchEngine:
+    """Batched exact inference over a bn_arrays network."""
+
+    def __init__(self, net=None, chunk_size: int = 65536):
+        """
+        Args:
+            net: A network dict from bn_arrays (a DiscreteBayesianNetwork is
+                converted); built from prob-interface.py if omitted.
+            chunk_size: Rows contracted at a time, bounding peak memory.
+        """
+        if net is None:
+            net = bn_arrays.load_network()
+        elif not isinstance(net, dict):
+            net = bn_arrays.from_model(net)
+        self.net        = net
+        self.nodes      = list(net["nodes"])
+        self.var_id     = {v: i for i, v in enumerate(self.nodes)}
+        self.max_card   = max(net["cards"].values())
+        self.chunk_size = chunk_size
+        self._batch_axis = len(self.nodes)
+
+        self._factors = [
+            (net["cpts"][v], [self.var_id[u] for u in [v] + net["parents"][v]])
+            for v in self.nodes
+        ]
+        self._moral = self._moral_masks()
+        self._scope_cache = {}
+        self.orders = {v: self._optimal_order(self.var_id[v]) for v in self.nodes}
+
+    # ── Contraction order ───────────────────────────────────────────────
+
+    def _moral_masks(self) -> list:
+        adj = [0] * len(self.nodes)
+        for _, axes in self._factors:
+            for a in axes:
+                for b in axes:
+                    if a != b:
+                        adj[a] |= 1 << b
+        return adj
+
+    def _scope(self, v: int, eliminated: int) -> int:
+        """Variables in the factor created by summing out v after `eliminated`."""
+        key = (v, eliminated)
+        if key not in self._scope_cache:
+            scope, frontier, seen = 1 << v, [v], 1 << v
+            while frontier:
+                u = frontier.pop()
+                nbrs = self._moral[u] & ~seen
+                seen |= nbrs
+                scope |= nbrs
+                # Paths continue only through already-eliminated variables.
+                for w in range(len(self.nodes)):
+                    if nbrs >> w & 1 and eliminated >> w & 1:
+                        frontier.append(w)
+            self._scope_cache[key] = scope
+        return self._scope_cache[key]
+
+    def _cost(self, scope: int) -> int:
+        cards = self.net["cards"]
+        return math.prod(cards[self.nodes[w]] for w in range(len(self.nodes)) if scope >> w & 1)
+
+    def _optimal_order(self, query: int) -> list:
+        """Elimination order of every variable but `query` with least total work."""
+        others = [i for i in range(len(self.nodes)) if i != query]
+        best   = {0: (0, [])}
+        for _ in others:
+            layer = {}
+            for mask, (cost, order) in best.items():
+                for v in others:
+                    if mask >> v & 1:
+                        continue
+                    step = cost + self._cost(self._scope(v, mask))
+                    nxt  = mask | 1 << v
+                    if nxt not in layer or step < layer[nxt][0]:
+                        layer[nxt] = (step, order + [v])
+            best = layer
+        return next(iter(best.values()))[1]
+
+    # ── Evidence ────────────────────────────────────────────────────────
+
+    def encode(self, rows) -> np.ndarray:
+        """Evidence rows as state codes; see bn_arrays.encode_evidence."""
+        return bn_arrays.encode_evidence(self.net, rows)
+
+    # ── Inference ───────────────────────────────────────────────────────
+
+    def _contract(self, query: int, likelihoods: dict, n_rows: int) -> np.ndarray:
+        batch   = self._batch_axis
+        factors = list(self._factors)
+        factors += [(lam, [batch, v]) for v, lam in likelihoods.items()]
+
+        for v in self.orders[self.nodes[query]]:
+            bucket = [f for f in factors if v in f[1]]
+            factors = [f for f in factors if v not in f[1]]
+            out = []
+            for _, axes in bucket:
+                out += [a for a in axes if a != v and a not in out]
+            args = []
+            for table, axes in bucket:
+                args += [table, axes]
+            factors.append((np.einsum(*args, out, optimize=True), out))
+
+        args = []
+        for table, axes in factors:
+            args += [table, axes]
+        if not any(batch in axes for _, axes in factors):
+            args += [np.ones(n_rows), [batch]]
+        joint = np.einsum(*args, [batch, query], optimize=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return joint / joint.sum(axis=1, keepdims=True)
+
+    def posteriors(self, evidence) -> np.ndarray:
+        """Posterior marginal of every variable for every evidence row.
+
+        Args:
+            evidence: An array from encode (or anything encode accepts).
+
+        Returns:
+            np.ndarray: float64 of shape (n_rows, n_nodes, max_card),
+            zero-padded beyond each variable's cardinality. Observed
+            variables come back one-hot; rows whose evidence has zero
+            probability are NaN.
+        """
+        if not isinstance(evidence, np.ndarray):
+            evidence = self.encode(evidence)
+        n_rows = evidence.shape[0]
+        out    = np.zeros((n_rows, len(self.nodes), self.max_card))
+
+        for start in range(0, n_rows, self.chunk_size):
+            chunk = evidence[start:start + self.chunk_size]
+            likelihoods = {}
+            for v, var in enumerate(self.nodes):
+                col = chunk[:, v]
+                if (col == MISSING).all():
+                    continue
+                card = self.net["cards"][var]
+                lam  = (col[:, None] == np.arange(card)).astype(np.float64)
+                lam[col == MISSING] = 1.0
+                likelihoods[v] = lam
+            for q, var in enumerate(self.nodes):
+                card = self.net["cards"][var]
+                out[start:start + len(chunk), q, :card] = self._contract(q, likelihoods, len(chunk))
+        return out
+
+    def marginals(self, evidence, variables=None) -> dict:
+        """{variable: (n_rows, card) array} view of posteriors()."""
+        probs = self.posteriors(evidence)
+        return {var: probs[:, self.var_id[var], :self.net["cards"][var]]
+                for var in (variables or self.nodes)}
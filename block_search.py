@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+block_search.py  -  Per-Athlete Block-Length Optimiser
+=======================================================
+Fits BLOCK_CONFIG to an athlete: finds the block lengths for which the
+1RMs projected by `generate_logs` reach target_squat_1rm,
+target_bench_1rm and target_deadlift_1rm in the fewest total weeks.
+
+In the current progression model estimated 1RMs grow by `weekly_gain`
+on every non-deload week whatever the intensity, so the intensity window
+cannot change whether a target is reached. Each candidate therefore only
+varies block lengths; the intensity ramp of every block is kept and
+simply re-spread over its new length by generate_logs.
+
+Search:
+  * candidates are enumerated in order of increasing total weeks, so the
+    first level containing a feasible configuration is optimal and the
+    search stops there;
+  * projections are memoised per (plan, block lengths, starting 1RMs);
+  * candidates are evaluated in-process, lazily, so the search stops at
+    the first feasible level; only a lattice of at least POOL_MIN_JOBS
+    candidates goes to a process pool, as one batched map (per-level maps
+    of a few tiny jobs cost more in pickling than they save);
+  * `fit_roster` fans whole athletes out across a pool.
+
+Usage:
+    python block_search.py
+"""
+
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import product
+
+import planning
+from log_columnar import ONE_RM_FIELDS
+from monte_carlo import TARGET_FIELDS
+
+DEFAULT_WEEKS_RANGE = (3, 8)
+
+# Smallest candidate lattice worth shipping to a process pool.
+POOL_MIN_JOBS = 4096
+
+
+@lru_cache(maxsize=65536)
+def project_1rms(plan: tuple, block_weeks: tuple, start: tuple) -> tuple:
+    """
+    End-of-plan 1RMs for each main lift, using the same compounding and
+    rounding as planning.iter_logs (growth after every non-deload week).
+    """
+    one_rms = list(start)
+    for action, weeks in zip(plan, block_weeks):
+        gain = planning.BLOCK_CONFIG[action]["weekly_gain"]
+        for bw in range(1, weeks + 1):
+            if (bw % 4 == 0) and weeks >= 4:
+                continue
+            one_rms = [round(rm * (1 + gain), 2) for rm in one_rms]
+    return tuple(one_rms)
+
+
+def _evaluate(args: tuple) -> tuple:
+    """Pool-friendly wrapper: (plan, block_weeks, start, targets) -> (weeks, margin)."""
+    plan, block_weeks, start, targets = args
+    final  = project_1rms(plan, block_weeks, start)
+    margin = min(f / t for f, t in zip(final, targets))
+    return block_weeks, margin
+
+
+def fit_block_config(user: dict, plan: list | None = None,
+                     weeks_range: tuple = DEFAULT_WEEKS_RANGE,
+                     pool=None) -> dict | None:
+    """
+    Shortest block lengths that reach every target 1RM.
+
+    Parameters
+    ----------
+    user        : dict  – athlete profile (same keys as planning.USER)
+    plan        : list, optional – block sequence; default is the athlete's
+                  optimal plan from planning.optimal_planner
+    weeks_range : (min, max) weeks allowed per block
+    pool        : concurrent.futures executor, optional – evaluates the
+                  whole candidate lattice in parallel when it has at least
+                  POOL_MIN_JOBS candidates
+
+    Returns
+    -------
+    dict with "plan", "block_weeks", "total_weeks", "projected" (per lift),
+    "margin" (min projected/target ratio) and "block_config" (a BLOCK_CONFIG
+    copy with the fitted lengths, usable as generate_logs(block_config=...)),
+    or None if no length in `weeks_range` reaches the targets.
+    """
+    if plan is None:
+        squat_ratio = user["current_squat_1rm"] / user["target_squat_1rm"]
+        plan = planning.optimal_planner(planning.initial_atoms(squat_ratio), {"goal-reached"})
+        if plan is None:
+            return None
+    plan    = tuple(plan)
+    start   = tuple(user[ONE_RM_FIELDS[l]] for l in planning.MAIN_LIFTS)
+    targets = tuple(user[TARGET_FIELDS[l]] for l in planning.MAIN_LIFTS)
+    lo, hi  = weeks_range
+
+    candidates = sorted(product(range(lo, hi + 1), repeat=len(plan)), key=sum)
+    jobs = [(plan, c, start, targets) for c in candidates]
+    if pool is not None and len(jobs) >= POOL_MIN_JOBS:
+        results = pool.map(_evaluate, jobs, chunksize=max(1, len(jobs) // 64))
+    else:
+        results = map(_evaluate, jobs)
+
+    # Results arrive in increasing total weeks: stop after the first level
+    # with a feasible candidate, keeping its largest margin.
+    best = None
+    for block_weeks, margin in results:
+        total = sum(block_weeks)
+        if best is not None and total > best[0]:
+            break
+        if margin >= 1.0 and (best is None or (margin, block_weeks) > best[1:]):
+            best = (total, margin, block_weeks)
+    if best is None:
+        return None
+
+    total, margin, block_weeks = best
+    config = copy.deepcopy(planning.BLOCK_CONFIG)
+    for action, weeks in zip(plan, block_weeks):
+        config[action]["weeks"] = weeks
+    return {
+        "plan":         list(plan),
+        "block_weeks":  dict(zip(plan, block_weeks)),
+        "total_weeks":  total,
+        "projected":    dict(zip(planning.MAIN_LIFTS,
+                                 project_1rms(plan, block_weeks, start))),
+        "margin":       margin,
+        "block_config": config,
+    }
+
+
+def _fit_one(args: tuple):
+    user, weeks_range = args
+    return fit_block_config(user, weeks_range=weeks_range)
+
+
+def fit_roster(users: list, weeks_range: tuple = DEFAULT_WEEKS_RANGE,
+               workers: int | None = None) -> list:
+    """Fit every athlete in parallel; results are in roster order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_fit_one, [(u, weeks_range) for u in users], chunksize=16))
+
+
+def main():
+    SEP  = "=" * 64
+    user = planning.USER
+    fit  = fit_block_config(user)
+    print(SEP)
+    print("  BLOCK SEARCH  -  fewest weeks reaching every target 1RM")
+    print(SEP)
+    if fit is None:
+        print(f"  No block lengths in {DEFAULT_WEEKS_RANGE} reach the targets.")
+    else:
+        for action, weeks in fit["block_weeks"].items():
+            print(f'  {planning.BLOCK_CONFIG[action]["label"]:16s} {weeks} wks')
+        print(f'  Total: {fit["total_weeks"]} weeks')
+        for lift, rm in fit["projected"].items():
+            print(f'  {lift:12s} {rm:7.1f} kg  (target {user[TARGET_FIELDS[lift]]} kg)')
+    print(SEP)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Virtual Lifter: Network as Plain Arrays
+---------------------------------------
+A pgmpy-free description of the Bayesian Network from prob-interface.py,
+shared by the NumPy inference, sampling and learning modules.
+
+A network is a dict:
+    nodes   - variable names in topological order (parents first)
+    parents - {node: [parent, ...]} in the CPD's evidence order
+    cards   - {node: number of states}
+    states  - {node: [state name, ...]}
+    cpts    - {node: np.ndarray of shape (card, *parent_cards)}, i.e. the
+              TabularCPD values with the child on axis 0
+
+build_network() reads the CPDs of prob-interface.py as plain data
+(EDGES, cpd_specs) and validates them with NumPy, so nothing on the
+inference path imports pgmpy. load_network() returns the network from a
+saved artefact (virtual_lifter_model.npz) when it is current, so workers
+and app containers skip even that.
+Rebuild it explicitly with:
+    python bn_arrays.py
+
+Dependencies:
+    pip install numpy   (pgmpy only for from_model / to_model)
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Saved, pre-validated network; see save_network / load_network.
+MODEL_FILE = os.path.join(_HERE, "virtual_lifter_model.npz")
+
+# Files whose contents define the model, including this one (from_specs
+# builds the arrays); editing any of them invalidates the saved artefact.
+MODEL_SOURCES = ["prob-interface.py", "cpt_builder.py", "bn_arrays.py"]
+
+# Code of an unobserved variable in encoded evidence rows.
+MISSING = -1
+
+
+def from_model(model):
+    """Extract the arrays of a validated DiscreteBayesianNetwork.
+
+    Args:
+        model: A DiscreteBayesianNetwork with CPDs attached.
+
+    Returns:
+        dict: The network in the format described in the module docstring.
+    """
+    parents, cards, states, cpts = {}, {}, {}, {}
+    for cpd in model.get_cpds():
+        var = cpd.variable
+        parents[var] = list(cpd.variables[1:])
+        cards[var]   = int(cpd.variable_card)
+        states[var]  = list(cpd.state_names[var])
+        cpts[var]    = np.ascontiguousarray(cpd.values, dtype=np.float64)
+
+    return {"nodes": _topological(list(model.nodes()), parents), "parents": parents,
+            "cards": cards, "states": states, "cpts": cpts}
+
+
+def _topological(pending: list, parents: dict) -> list:
+    """Kahn's algorithm, keeping the given node order among ready nodes."""
+    order, placed = [], set()
+    while pending:
+        ready = [n for n in pending if all(p in placed for p in parents[n])]
+        if not ready:
+            raise ValueError("Network has a directed cycle")
+        for n in ready:
+            order.append(n)
+            placed.add(n)
+        pending = [n for n in pending if n not in placed]
+    return order
+
+
+def from_specs(edges, specs) -> dict:
+    """Build and validate a network from TabularCPD keyword arguments, without pgmpy.
+
+    Performs the checks of DiscreteBayesianNetwork.check_model that matter
+    here: one CPD per node, CPD evidence matching the edges, consistent
+    state names and columns summing to 1. Node order is the one pgmpy
+    would give the same edges, so the result equals
+    from_model(DiscreteBayesianNetwork(edges) + specs).
+
+    Args:
+        edges: [(parent, child), ...].
+        specs: [{variable, variable_card, values, evidence, evidence_card,
+            state_names}, ...] as accepted by TabularCPD.
+    """
+    pending = []
+    for edge in edges:
+        pending += [n for n in edge if n not in pending]
+    pending += [s["variable"] for s in specs if s["variable"] not in pending]
+
+    parents, cards, states, cpts = {}, {}, {}, {}
+    for spec in specs:
+        var = spec["variable"]
+        if var in cpts:
+            raise ValueError(f"Two CPDs for {var!r}")
+        parents[var] = list(spec.get("evidence") or [])
+        cards[var]   = int(spec["variable_card"])
+        shape = (cards[var],) + tuple(spec.get("evidence_card") or [])
+        cpt   = np.asarray(spec["values"], dtype=np.float64)
+        if cpt.size != int(np.prod(shape)) or len(shape) != len(parents[var]) + 1:
+            raise ValueError(f"CPD of {var!r} does not match its cardinalities")
+        cpts[var] = np.ascontiguousarray(cpt.reshape(shape))
+        for node, names in spec["state_names"].items():
+            if states.setdefault(node, list(names)) != list(names):
+                raise ValueError(f"Inconsistent state names for {node!r}")
+
+    missing = [n for n in pending if n not in cpts]
+    if missing:
+        raise ValueError(f"No CPD for {missing}")
+    for var in pending:
+        if set(parents[var]) != {p for p, c in edges if c == var}:
+            raise ValueError(f"CPD evidence of {var!r} does not match the edges")
+        if len(states[var]) != cards[var]:
+            raise ValueError(f"{var!r} has {cards[var]} states but {len(states[var])} names")
+        for p, card in zip(parents[var], cpts[var].shape[1:]):
+            if card != cards[p]:
+                raise ValueError(f"Evidence card of {p!r} in the CPD of {var!r} is wrong")
+        if not np.allclose(cpts[var].sum(axis=0), 1.0, atol=0.01) or (cpts[var] < 0).any():
+            raise ValueError(f"CPD of {var!r} is not a distribution over {var!r}")
+
+    return {"nodes": _topological(pending, parents), "parents": parents,
+            "cards": cards, "states": {n: states[n] for n in pending}, "cpts": cpts}
+
+
+def build_network():
+    """Build and validate the Virtual Lifter model (NumPy only); return its arrays."""
+    prob_interface = importlib.import_module("prob-interface")
+    return from_specs(prob_interface.EDGES, prob_interface.cpd_specs())
+
+
+def source_hash() -> str:
+    """Hash of the source files that define the model (see MODEL_SOURCES)."""
+    h = hashlib.sha256()
+    for name in MODEL_SOURCES:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def save_network(net, path: str = MODEL_FILE, source: str | None = None) -> None:
+    """Write a validated network as an .npz artefact.
+
+    Args:
+        net: A network dict (already validated, e.g. from build_network).
+        path: Output path; written atomically.
+        source: source_hash() of the code it was built from, used by
+            load_network to detect a stale artefact.
+    """
+    meta = {
+        "nodes":   net["nodes"],
+        "parents": net["parents"],
+        "cards":   net["cards"],
+        "states":  net["states"],
+        "hash":    network_hash(net),
+        "source":  source,
+    }
+    arrays   = {f"cpt_{i}": net["cpts"][node] for i, node in enumerate(net["nodes"])}
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_network(path: str = MODEL_FILE) -> dict:
+    """Load an artefact written by save_network (NumPy only, no re-validation).
+
+    The content hash is recomputed and compared, so a truncated or edited
+    file raises ValueError instead of yielding a wrong model.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        cpts = {node: data[f"cpt_{i}"] for i, node in enumerate(meta["nodes"])}
+    net = {"nodes": meta["nodes"], "parents": meta["parents"], "cards": meta["cards"],
+           "states": meta["states"], "cpts": cpts}
+    if network_hash(net) != meta["hash"]:
+        raise ValueError(f"'{path}' does not match its content hash")
+    net["source"] = meta["source"]
+    return net
+
+
+def load_network(path: str = MODEL_FILE, rebuild: bool = False) -> dict:
+    """The Virtual Lifter network, from the artefact when it is current.
+
+    The artefact is used as long as it was built from the current model
+    sources; otherwise (or with rebuild=True) the model is rebuilt from them
+    and the artefact rewritten. A read-only location just skips the write.
+    """
+    current = source_hash()
+    if not rebuild and os.path.exists(path):
+        try:
+            net = read_network(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            net = None
+        if net is not None and net.pop("source") == current:
+            return net
+
+    net = build_network()
+    try:
+        save_network(net, path, source=current)
+    except OSError:
+        pass
+    return net
+
+
+def to_model(net, validate: bool = True):
+    """Rebuild a pgmpy DiscreteBayesianNetwork from a network dict."""
+    from pgmpy.factors.discrete import TabularCPD
+    from pgmpy.models import DiscreteBayesianNetwork
+
+    model = DiscreteBayesianNetwork([(p, v) for v in net["nodes"] for p in net["parents"][v]])
+    model.add_nodes_from(net["nodes"])
+    for v in net["nodes"]:
+        parents = net["parents"][v]
+        model.add_cpds(TabularCPD(
+            variable=v, variable_card=net["cards"][v],
+            values=net["cpts"][v].reshape(net["cards"][v], -1),
+            evidence=parents or None,
+            evidence_card=[net["cards"][p] for p in parents] or None,
+            state_names={u: net["states"][u] for u in [v] + parents},
+        ))
+    if validate:
+        assert model.check_model()
+    return model
+
+
+def network_hash(net) -> str:
+    """Content hash of structure, state names and CPD values."""
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "nodes":   net["nodes"],
+        "parents": net["parents"],
+        "states":  net["states"],
+    }, sort_keys=True).encode())
+    for node in net["nodes"]:
+        h.update(np.ascontiguousarray(net["cpts"][node], dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def state_index(net, node, state) -> int:
+    """Position of a state name (or an int code, passed through) for `node`."""
+    if isinstance(state, (int, np.integer)):
+        return int(state)
+    return net["states"][node].index(state)
+
+
+def encode_evidence(net, rows) -> np.ndarray:
+    """Evidence rows as an int array of state codes, MISSING where unobserved.
+
+    Args:
+        net: A network dict.
+        rows: A list of {variable: state name or code} dicts, or a column
+            mapping such as a pandas DataFrame in the schema of
+            synthetic_lifting_logs.csv (None / NaN / "" mean missing;
+            columns that are not network variables are ignored). Read the
+            CSV with keep_default_na=False: "None" is a Soreness state, not
+            a missing value.
+
+    Raises:
+        ValueError: A state name that is not one of the variable's states,
+            in either form.
+
+    Returns:
+        np.ndarray: int16 of shape (n_rows, n_nodes), columns in net["nodes"]
+        order.
+    """
+    nodes = net["nodes"]
+    if isinstance(rows, list):
+        position = {v: i for i, v in enumerate(nodes)}
+        codes = np.full((len(rows), len(nodes)), MISSING, dtype=np.int16)
+        for r, row in enumerate(rows):
+            for var, state in row.items():
+                codes[r, position[var]] = state_index(net, var, state)
+        return codes
+
+    codes = np.full((len(rows), len(nodes)), MISSING, dtype=np.int16)
+    for i, var in enumerate(nodes):
+        if var not in rows:
+            continue
+        lookup = {s: j for j, s in enumerate(net["states"][var])}
+        lookup[""] = MISSING
+        try:
+            codes[:, i] = [
+                lookup[s] if isinstance(s, str) else
+                (MISSING if s is None or s != s else int(s))
+                for s in rows[var]
+            ]
+        except KeyError as exc:
+            raise ValueError(f"Unknown state {exc.args[0]!r} for {var!r}; "
+                             f"expected one of {net['states'][var]}") from None
+    return codes
+
+
+# ── Run when executed directly ──
+if __name__ == "__main__":
+    net = load_network(rebuild=True)
+    print(f"Saved {len(net['nodes'])}-node network to '{MODEL_FILE}' "
+          f"(model {network_hash(net)[:12]}).")
@@ -0,0 +1,242 @@
+"""
+Virtual Lifter: Vectorised Ancestral Sampler
+--------------------------------------------
+Forward-samples the Bayesian Network from prob-interface.py with NumPy,
+replacing pgmpy's BayesianModelSampling.forward_sample.
+
+Nodes are visited in topological order and each one is drawn for the whole
+batch at once: the parents' codes give a mixed-radix column index into the
+node's CPD, and one uniform draw per row is compared against that column's
+cumulative distribution (inverse-CDF). Samples stay as uint8 state codes
+and are only turned into state names when written out.
+
+Large datasets are produced in chunks, each with its own RNG stream spawned
+from one SeedSequence, so the output for a given seed is identical whether
+the chunks run in this process or on a process pool.
+
+Usage:
+    python bn_sampler.py -n 10000000 --out synthetic_lifting_logs.csv --seed 0
+    python bn_sampler.py -n 100000000 --out synthetic_lifting_logs.vlc
+    python bn_sampler.py -n 1000000000 --counts --out lifting_counts.npz
+
+Dependencies:
+    pip install numpy   (pandas only for sample_frame)
+"""
+
+import argparse
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bn_arrays
+
+# Column order of synthetic_lifting_logs.csv: causes to effects.
+COLUMN_ORDER = [
+    'Sleep', 'Macros', 'TimeRest',              # Roots
+    'Recovery', 'Fatigue', 'Readiness', 'Risk', # Hidden
+    'Soreness', 'Weight', 'Volume', 'RPE',      # Outputs
+]
+DEFAULT_CHUNK = 1_000_000
+
+
+def compile_sampler(net) -> list:
+    """Per-node sampling plan: (node, parent positions, radices, cumulative table).
+
+    The cumulative table has one row per state and one column per parent
+    configuration (the CPD's column order); its last row is exactly 1.
+    """
+    position = {v: i for i, v in enumerate(net["nodes"])}
+    plan = []
+    for node in net["nodes"]:
+        parents = net["parents"][node]
+        cpt     = net["cpts"][node].reshape(net["cards"][node], -1)
+        cdf     = np.cumsum(cpt, axis=0)
+        cdf[-1] = 1.0
+        radices = [int(np.prod([net["cards"][p] for p in parents[i + 1:]], dtype=np.int64))
+                   for i in range(len(parents))]
+        plan.append((node, [position[p] for p in parents], radices, cdf))
+    return plan
+
+
+def sample_codes(plan, n: int, rng) -> np.ndarray:
+    """Draw `n` joint samples as uint8 codes, columns in topological order."""
+    codes = np.empty((n, len(plan)), dtype=np.uint8)
+    for i, (node, parent_pos, radices, cdf) in enumerate(plan):
+        column = np.zeros(n, dtype=np.intp)
+        for pos, radix in zip(parent_pos, radices):
+            column += codes[:, pos].astype(np.intp) * radix
+        u    = rng.random(n)
+        code = codes[:, i]
+        code[:] = 0
+        for k in range(len(cdf) - 1):
+            code += u >= cdf[k][column]
+    return codes
+
+
+def _chunk_sizes(n: int, chunk_size: int) -> list:
+    return [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+
+
+def _init_worker(plan) -> None:
+    global _PLAN
+    _PLAN = plan
+
+
+def _sample_chunk(args) -> np.ndarray:
+    n, seed_seq = args
+    return sample_codes(_PLAN, n, np.random.default_rng(seed_seq))
+
+
+def iter_code_chunks(net, n: int, seed=None, chunk_size: int = DEFAULT_CHUNK,
+                     workers: int | None = 1):
+    """Yield uint8 code arrays of up to `chunk_size` rows, `n` rows in total.
+
+    Args:
+        net: A bn_arrays network.
+        n: Total number of samples.
+        seed: Seed for the root SeedSequence (None for fresh entropy).
+        chunk_size: Rows per chunk; each chunk has its own RNG stream.
+        workers: Processes to sample on; 1 samples in this process, None
+            uses every CPU. The output does not depend on this.
+
+    Yields:
+        np.ndarray: (rows, n_nodes) uint8, columns in net["nodes"] order.
+
+    On a pool at most 2 x workers chunks are in flight or waiting to be
+    consumed, so memory stays bounded by the chunk size even when the
+    consumer is slower than the samplers. The plan is sent to each worker
+    once, by the pool initializer.
+    """
+    plan   = compile_sampler(net)
+    sizes  = _chunk_sizes(n, chunk_size)
+    seeds  = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs   = list(zip(sizes, seeds))
+    if workers == 1 or len(jobs) <= 1:
+        for size, seed_seq in jobs:
+            yield sample_codes(plan, size, np.random.default_rng(seed_seq))
+        return
+
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(plan,)) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(_sample_chunk, job))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def sample_frame(net, n: int, seed=None):
+    """`n` samples as a pandas DataFrame of state names in COLUMN_ORDER."""
+    import pandas as pd
+
+    codes    = np.concatenate(list(iter_code_chunks(net, n, seed=seed))) if n else \
+        np.empty((0, len(net["nodes"])), dtype=np.uint8)
+    position = {v: i for i, v in enumerate(net["nodes"])}
+    return pd.DataFrame({
+        var: np.array(net["states"][var], dtype=object)[codes[:, position[var]]]
+        for var in COLUMN_ORDER
+    })
+
+
+def _csv_line(values) -> str:
+    """One CSV record, quoted by the csv module where a value needs it."""
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(values)
+    return out.getvalue()
+
+
+def _csv_rows(net, codes: np.ndarray) -> str:
+    """CSV text for a code chunk; each distinct row is formatted only once."""
+    position = [net["nodes"].index(var) for var in COLUMN_ORDER]
+    cards    = [net["cards"][var] for var in COLUMN_ORDER]
+    key      = np.zeros(len(codes), dtype=np.int64)
+    for pos, card in zip(position, cards):
+        key = key * card + codes[:, pos]
+    uniq, inverse = np.unique(key, return_inverse=True)
+
+    states = [net["states"][var] for var in COLUMN_ORDER]
+    lines  = []
+    for k in uniq.tolist():
+        row = []
+        for s, card in zip(reversed(states), reversed(cards)):
+            k, c = divmod(k, card)
+            row.append(s[c])
+        lines.append(_csv_line(reversed(row)))
+    return "".join(np.array(lines, dtype=object)[inverse.ravel()])
+
+
+def write_csv(net, path: str, n: int, seed=None, chunk_size: int = DEFAULT_CHUNK,
+              workers: int | None = 1) -> int:
+    """Stream `n` samples to a CSV in the synthetic_lifting_logs.csv schema.
+
+    Returns:
+        int: Number of rows written.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    with open(tmp_path, "w", newline="") as f:
+        f.write(_csv_line(COLUMN_ORDER))
+        for codes in iter_code_chunks(net, n, seed=seed, chunk_size=chunk_size, workers=workers):
+            f.write(_csv_rows(net, codes))
+            rows += len(codes)
+    os.replace(tmp_path, path)
+    return rows
+
+
+def write_binary(net, path: str, n: int, seed=None, chunk_size: int = DEFAULT_CHUNK,
+                 workers: int | None = 1) -> int:
+    """Stream `n` samples to a categorical .vlc file (see categorical_store).
+
+    Returns:
+        int: Number of rows written.
+    """
+    from categorical_store import CategoricalWriter
+
+    position = [net["nodes"].index(var) for var in COLUMN_ORDER]
+    with CategoricalWriter(path, COLUMN_ORDER, net["states"]) as writer:
+        for codes in iter_code_chunks(net, n, seed=seed, chunk_size=chunk_size, workers=workers):
+            writer.write(codes[:, position])
+    return writer.n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample synthetic lifting logs.")
+    parser.add_argument("-n", "--num-samples", type=int, default=10000)
+    parser.add_argument("--out", default="synthetic_lifting_logs.csv")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="sampling processes (0 = one per CPU)")
+    parser.add_argument("--counts", action="store_true",
+                        help="write a (configuration, count) table instead of rows "
+                             "(.npz if --out ends in .npz, else CSV with a Count column)")
+    args = parser.parse_args()
+
+    net = bn_arrays.load_network()
+    if args.counts:
+        import count_table
+
+        table = count_table.sample_counts(net, args.num_samples, seed=args.seed)
+        if args.out.endswith(".npz"):
+            count_table.save_counts(table, args.out)
+        else:
+            count_table.write_counts_csv(table, args.out)
+        print(f"Counted {table['total']} lifting logs in {len(table['counts'])} "
+              f"configurations -> '{args.out}'.")
+        return
+
+    write = write_binary if args.out.endswith(".vlc") else write_csv
+    rows  = write(net, args.out, args.num_samples, seed=args.seed,
+                  chunk_size=args.chunk_size, workers=args.workers or None)
+    print(f"Generated {rows} lifting logs -> '{args.out}'.")
+
+
+if __name__ == "__main__":
+    main()
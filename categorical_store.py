@@ -0,0 +1,233 @@
+"""
+Virtual Lifter: Categorical Binary Log Format
+---------------------------------------------
+A compact columnar replacement for synthetic_lifting_logs.csv. Every column
+is stored once as a contiguous uint8 array of state codes; the state names
+(the state_names of build_model) live in a small JSON header, so long
+labels such as "Working (70-85% 1RM)" are never repeated per row.
+
+File layout (.vlc):
+    8 bytes   magic  b"VLCAT\\x00\\x01\\x00"
+    8 bytes   header length, little-endian uint64
+    header    JSON: n_rows, columns, states, offsets (byte offset of each
+              column from the start of the file)
+    padding   to a 64-byte boundary, then each column's codes, each
+              starting on a 64-byte boundary
+
+The reader maps columns with np.memmap on demand, so opening a file only
+reads the header, and slicing or filtering touches just the pages of the
+columns involved.
+
+Usage:
+    python categorical_store.py synthetic_lifting_logs.csv synthetic_lifting_logs.vlc
+
+Dependencies:
+    pip install numpy   (pandas only for CSV conversion / to_frame)
+"""
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+MAGIC = b"VLCAT\x00\x01\x00"
+ALIGN = 64
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def encode_column(values, states: list) -> np.ndarray:
+    """State names -> uint8 codes; raises ValueError on an unknown state."""
+    index = {s: i for i, s in enumerate(states)}
+    try:
+        return np.fromiter((index[v] for v in values), dtype=np.uint8, count=len(values))
+    except KeyError as exc:
+        raise ValueError(f"Unknown state {exc.args[0]!r}; expected one of {states}") from None
+
+
+class CategoricalWriter:
+    """Streams code chunks into a .vlc file.
+
+    Chunks are appended to one spill file per column and assembled into the
+    final column-major file on close(), so the row count need not be known
+    up front.
+    """
+
+    def __init__(self, path: str, columns: list, states: dict):
+        """
+        Args:
+            path: Output .vlc path (written atomically on close).
+            columns: Column names, in the order chunks provide them.
+            states: {column: [state name, ...]}; codes index these lists.
+        """
+        for col in columns:
+            if len(states[col]) > 256:
+                raise ValueError(f"Column {col!r} has more than 256 states")
+        self.path    = path
+        self.columns = list(columns)
+        self.states  = {c: list(states[c]) for c in self.columns}
+        self.n_rows  = 0
+        self._tmpdir = tempfile.mkdtemp(prefix="vlc-", dir=os.path.dirname(os.path.abspath(path)))
+        self._spill  = [open(os.path.join(self._tmpdir, f"{i}.u8"), "wb")
+                        for i in range(len(self.columns))]
+
+    def write(self, codes: np.ndarray) -> None:
+        """Append a (rows, n_columns) array of state codes.
+
+        Raises ValueError, before anything is written, if a code is not a
+        valid state index of its column.
+        """
+        codes = np.asarray(codes)
+        if codes.ndim != 2 or codes.shape[1] != len(self.columns):
+            raise ValueError(f"Expected shape (rows, {len(self.columns)}), got {codes.shape}")
+        if not np.issubdtype(codes.dtype, np.integer):
+            raise ValueError(f"Codes must be integers, got {codes.dtype}")
+        if len(codes):
+            lo, hi = codes.min(axis=0), codes.max(axis=0)
+            for col, low, high in zip(self.columns, lo.tolist(), hi.tolist()):
+                if low < 0 or high >= len(self.states[col]):
+                    raise ValueError(f"Codes of {col!r} span {low}..{high}; expected "
+                                     f"0..{len(self.states[col]) - 1}")
+        by_column = np.ascontiguousarray(codes.T, dtype=np.uint8)
+        for f, column in zip(self._spill, by_column):
+            f.write(column.tobytes())
+        self.n_rows += len(codes)
+
+    def write_labels(self, frame) -> None:
+        """Append a chunk of state names (a DataFrame or column mapping)."""
+        self.write(np.stack([encode_column(list(frame[c]), self.states[c])
+                             for c in self.columns], axis=1))
+
+    def close(self) -> None:
+        for f in self._spill:
+            f.close()
+        header = {"n_rows": self.n_rows, "columns": self.columns,
+                  "states": self.states, "offsets": []}
+        # Offsets depend on the header length, which depends on the offsets'
+        # digits; size the header with a generous placeholder first.
+        header["offsets"] = [10 ** 18] * len(self.columns)
+        start = _aligned(16 + len(json.dumps(header).encode()))
+        header["offsets"] = [start + i * _aligned(self.n_rows) for i in range(len(self.columns))]
+        blob = json.dumps(header).encode()
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(MAGIC + struct.pack("<Q", len(blob)) + blob)
+            for i, offset in enumerate(header["offsets"]):
+                out.write(b"\0" * (offset - out.tell()))
+                with open(self._spill[i].name, "rb") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+        os.replace(tmp_path, self.path)
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._spill:
+                f.close()
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+class CategoricalLog:
+    """Read-only, memory-mapped view of a .vlc file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{path}' is not a categorical log file")
+            (size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(size))
+        self.n_rows   = header["n_rows"]
+        self.columns  = header["columns"]
+        self.states   = header["states"]
+        self._offsets = dict(zip(self.columns, header["offsets"]))
+        self._maps    = {}
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def codes(self, column: str) -> np.ndarray:
+        """Zero-copy uint8 codes of one column."""
+        if column not in self._maps:
+            if self.n_rows == 0:
+                self._maps[column] = np.empty(0, dtype=np.uint8)
+            else:
+                self._maps[column] = np.memmap(self.path, dtype=np.uint8, mode="r",
+                                               offset=self._offsets[column],
+                                               shape=(self.n_rows,))
+        return self._maps[column]
+
+    def code_of(self, column: str, state: str) -> int:
+        return self.states[column].index(state)
+
+    def mask(self, **conditions) -> np.ndarray:
+        """Boolean row mask for column=state (or column=[states]) conditions."""
+        keep = np.ones(self.n_rows, dtype=bool)
+        for column, wanted in conditions.items():
+            if isinstance(wanted, str):
+                keep &= self.codes(column) == self.code_of(column, wanted)
+            else:
+                keep &= np.isin(self.codes(column), [self.code_of(column, s) for s in wanted])
+        return keep
+
+    def matrix(self, columns=None, rows=slice(None)) -> np.ndarray:
+        """(rows, len(columns)) uint8 code matrix."""
+        columns = columns or self.columns
+        return np.stack([self.codes(c)[rows] for c in columns], axis=1)
+
+    def labels(self, column: str, rows=slice(None)) -> np.ndarray:
+        """Decoded state names (object array) for the selected rows."""
+        return np.array(self.states[column], dtype=object)[self.codes(column)[rows]]
+
+    def to_frame(self, columns=None, rows=slice(None)):
+        """Decode selected columns and rows into a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame({c: self.labels(c, rows) for c in (columns or self.columns)})
+
+
+def open_log(path: str) -> CategoricalLog:
+    return CategoricalLog(path)
+
+
+def convert_csv(csv_path: str, path: str, states: dict | None = None,
+                chunksize: int = 1_000_000) -> int:
+    """Convert a CSV in the synthetic_lifting_logs.csv schema to .vlc.
+
+    Args:
+        states: {column: [state name, ...]}; taken from build_model if omitted.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pandas as pd
+
+    if states is None:
+        import bn_arrays
+
+        states = bn_arrays.load_network()["states"]
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    with CategoricalWriter(path, columns, states) as writer:
+        # keep_default_na=False: "None" is a Soreness state, not a missing value.
+        for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False,
+                                 chunksize=chunksize):
+            writer.write_labels(chunk)
+    return writer.n_rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python categorical_store.py <logs.csv> <logs.vlc>")
+    n = convert_csv(sys.argv[1], sys.argv[2])
+    print(f"Wrote {n} rows -> '{sys.argv[2]}' ({os.path.getsize(sys.argv[2])} bytes).")
@@ -0,0 +1,123 @@
+"""
+Virtual Lifter: Count-Table Sampling
+------------------------------------
+Every variable in the network has 3 states, so there are only 3^11 = 177,147
+distinct rows a sample can take. Instead of writing each sample out, this
+module produces the sufficient statistics directly: a table of
+(configuration, count) pairs for the configurations that occurred.
+
+Two ways to get one:
+  * sample_counts   - one multinomial draw over the exact joint distribution
+                      (product of all CPDs), so N samples cost the same
+                      whatever N is;
+  * counts_from_codes - aggregate sampled code chunks from bn_sampler (or
+                      logged data) with a single bincount per chunk.
+
+A table is a dict:
+    columns - variable names (COLUMN_ORDER of synthetic_lifting_logs.csv)
+    states  - {variable: [state name, ...]}
+    codes   - (k, n_columns) uint8 state codes of the observed configurations
+    counts  - (k,) int64 number of samples of each configuration
+    total   - sum of counts
+
+Dependencies:
+    pip install numpy   (pandas only for to_frame)
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from bn_sampler import COLUMN_ORDER
+
+
+def joint_probabilities(net, columns=COLUMN_ORDER) -> np.ndarray:
+    """Exact joint distribution as a dense array, one axis per column."""
+    var_id = {v: i for i, v in enumerate(net["nodes"])}
+    args   = []
+    for node in net["nodes"]:
+        args += [net["cpts"][node], [var_id[v] for v in [node] + net["parents"][node]]]
+    return np.einsum(*args, [var_id[v] for v in columns], optimize=True)
+
+
+def _table(net, flat_counts: np.ndarray, columns) -> dict:
+    shape = [net["cards"][v] for v in columns]
+    keys  = np.flatnonzero(flat_counts)
+    codes = np.stack(np.unravel_index(keys, shape), axis=1).astype(np.uint8)
+    return {
+        "columns": list(columns),
+        "states":  {v: list(net["states"][v]) for v in columns},
+        "codes":   codes,
+        "counts":  flat_counts[keys].astype(np.int64),
+        "total":   int(flat_counts.sum()),
+    }
+
+
+def sample_counts(net, n: int, seed=None, columns=COLUMN_ORDER) -> dict:
+    """Counts of `n` joint samples, drawn as one multinomial over the joint."""
+    p = joint_probabilities(net, columns).ravel()
+    p = p / p.sum()
+    rng = np.random.default_rng(seed)
+    return _table(net, rng.multinomial(n, p), columns)
+
+
+def counts_from_codes(net, chunks, columns=COLUMN_ORDER) -> dict:
+    """Aggregate code chunks (columns in net["nodes"] order) into a count table.
+
+    Args:
+        net: A bn_arrays network.
+        chunks: Iterable of (rows, n_nodes) integer code arrays, e.g. from
+            bn_sampler.iter_code_chunks.
+    """
+    position = [net["nodes"].index(v) for v in columns]
+    cards    = [net["cards"][v] for v in columns]
+    size     = int(np.prod(cards, dtype=np.int64))
+    totals   = np.zeros(size, dtype=np.int64)
+    for codes in chunks:
+        key = np.zeros(len(codes), dtype=np.int64)
+        for pos, card in zip(position, cards):
+            key = key * card + codes[:, pos]
+        totals += np.bincount(key, minlength=size)
+    return _table(net, totals, columns)
+
+
+def save_counts(table: dict, path: str) -> None:
+    meta = {k: table[k] for k in ("columns", "states", "total")}
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp_path, codes=table["codes"], counts=table["counts"],
+                        meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)
+
+
+def load_counts(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        table = json.loads(str(data["meta"]))
+        table["codes"]  = data["codes"]
+        table["counts"] = data["counts"]
+    return table
+
+
+def write_counts_csv(table: dict, path: str) -> None:
+    """One line per configuration: the state names followed by Count."""
+    states = [table["states"][v] for v in table["columns"]]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(table["columns"] + ["Count"])
+        writer.writerows(
+            [s[c] for s, c in zip(states, row)] + [count]
+            for row, count in zip(table["codes"].tolist(), table["counts"].tolist())
+        )
+
+
+def to_frame(table: dict):
+    """The table as a pandas DataFrame of state names plus a Count column."""
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        v: np.array(table["states"][v], dtype=object)[table["codes"][:, i]]
+        for i, v in enumerate(table["columns"])
+    })
+    frame["Count"] = table["counts"]
+    return frame
@@ -0,0 +1,73 @@
+"""
+Virtual Lifter: Score-Based CPT Builder
+---------------------------------------
+Builds conditional probability tables of the form used for Recovery in
+prob-interface.py: every parent state contributes a weighted score, and the
+total score of a parent configuration picks the child distribution from a
+list of threshold bands.
+
+The table is computed for all parent configurations at once with NumPy
+broadcasting (one score axis per parent, summed into the full grid), so it
+works for any number of parents; a million columns take a few tens of
+milliseconds. Columns follow pgmpy's TabularCPD order: the first parent
+varies slowest.
+
+Dependencies:
+    pip install numpy
+"""
+
+import numpy as np
+
+
+def score_grid(parent_cards, weights, state_scores=None) -> np.ndarray:
+    """Total score of every parent configuration, shaped parent_cards.
+
+    Args:
+        parent_cards: Number of states of each parent.
+        weights: Multiplier of each parent's state score.
+        state_scores: Optional per-parent sequences giving the score of each
+            state; defaults to the state index (0, 1, 2, ...).
+    """
+    if len(weights) != len(parent_cards):
+        raise ValueError("Need exactly one weight per parent")
+    if state_scores is None:
+        state_scores = [np.arange(card) for card in parent_cards]
+
+    grid = np.zeros(tuple(parent_cards))
+    for axis, (card, weight, scores) in enumerate(zip(parent_cards, weights, state_scores)):
+        scores = np.asarray(scores, dtype=np.float64)
+        if scores.shape != (card,):
+            raise ValueError(f"Parent {axis} needs {card} state scores, got {scores.shape}")
+        shape = [1] * len(parent_cards)
+        shape[axis] = card
+        grid = grid + weight * scores.reshape(shape)
+    return grid
+
+
+def score_cpt(parent_cards, weights, bands, state_scores=None) -> np.ndarray:
+    """CPT whose column distribution is chosen by the parents' total score.
+
+    Args:
+        parent_cards: Number of states of each parent.
+        weights: Multiplier of each parent's state score.
+        bands: [(upper threshold, child distribution), ...] in increasing
+            threshold order; a column uses the first band with
+            score <= threshold. The last threshold may be None (no upper
+            limit).
+        state_scores: See score_grid.
+
+    Returns:
+        np.ndarray: Shape (child card, prod(parent_cards)).
+    """
+    thresholds = np.array([np.inf if t is None else t for t, _ in bands], dtype=np.float64)
+    probs      = np.array([p for _, p in bands], dtype=np.float64)
+    if np.any(np.diff(thresholds) <= 0):
+        raise ValueError("Band thresholds must be strictly increasing")
+    if not np.allclose(probs.sum(axis=1), 1.0):
+        raise ValueError("Every band's distribution must sum to 1")
+
+    score = score_grid(parent_cards, weights, state_scores).ravel()
+    band  = np.searchsorted(thresholds, score, side="left")
+    if band.size and band.max() >= len(bands):
+        raise ValueError("Some scores exceed the last band threshold")
+    return probs[band].T
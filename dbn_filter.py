@@ -0,0 +1,218 @@
+"""
+Virtual Lifter: Two-Slice Dynamic Network and Readiness Filtering
+-----------------------------------------------------------------
+The network in prob-interface.py treats every session as independent. This
+module turns it into a two-slice dynamic Bayesian network in which the
+hidden physiological nodes (Recovery, Fatigue, Readiness) carry over from
+one session to the next, and keeps a filtered belief over them for many
+athletes at once.
+
+Temporal model. Within a slice the static network is unchanged. Each
+hidden node additionally depends on its own value in the previous session:
+
+    P(X_t | parents_t, X_t-1) = (1 - carry) * P_static(X_t | parents_t)
+                                + carry * [X_t == X_t-1]
+
+i.e. with probability `carry` yesterday's state persists, otherwise the
+node is redrawn from its usual CPD. carry = 0 for every node gives back the
+static network. The defaults below are a modelling assumption, not fitted
+values; pass `carry=` to override.
+
+Filtering. The belief state is the joint over the 27 hidden configurations,
+stored as an array of shape (n_athletes, 3, 3, 3). One step folds in a
+session's evidence - the lifestyle roots (Sleep, Macros, TimeRest) and any
+observed outputs (Soreness, Weight, Volume, RPE, even Risk), with missing
+values allowed - using a transition tensor precomputed per root
+configuration. The cost per athlete per session is constant, whatever the
+length of the macrocycle.
+
+Dependencies:
+    pip install numpy
+"""
+
+import numpy as np
+
+import bn_arrays
+from bn_arrays import MISSING
+
+HIDDEN = ("Recovery", "Fatigue", "Readiness")
+DEFAULT_CARRY = {"Recovery": 0.5, "Fatigue": 0.6, "Readiness": 0.3}
+
+# Athletes per block of the prediction step; bounds its scratch memory to
+# BLOCK_ROWS x n_hidden^2 floats (about 12 MB with 27 hidden configurations).
+BLOCK_ROWS = 2048
+
+
+class ReadinessFilter:
+    """Batched forward filter over the hidden nodes of the network."""
+
+    def __init__(self, net=None, carry: dict | None = None, hidden=HIDDEN):
+        """
+        Args:
+            net: A bn_arrays network (a DiscreteBayesianNetwork is
+                converted); the saved network is loaded if omitted.
+            carry: {hidden node: persistence probability}; DEFAULT_CARRY if
+                omitted, 0 for hidden nodes not listed.
+            hidden: The nodes carried between sessions.
+        """
+        if net is None:
+            net = bn_arrays.load_network()
+        elif not isinstance(net, dict):
+            net = bn_arrays.from_model(net)
+        self.net    = net
+        self.nodes  = list(net["nodes"])
+        self.hidden = list(hidden)
+        self.carry  = {h: 0.0 for h in self.hidden}
+        self.carry.update(DEFAULT_CARRY if carry is None else carry)
+
+        n = len(self.nodes)
+        self._id    = {v: i for i, v in enumerate(self.nodes)}
+        self._prev  = {h: n + i for i, h in enumerate(self.hidden)}   # X_t-1 labels
+        self._batch = n + len(self.hidden)
+        self.roots    = [v for v in self.nodes if not net["parents"][v]]
+        self.emission = [v for v in self.nodes
+                         if v not in self.roots and v not in self.hidden]
+        self.shape    = tuple(net["cards"][h] for h in self.hidden)
+        for v in self.emission:
+            if any(p in self.roots for p in net["parents"][v]):
+                raise ValueError(f"{v!r} depends on a root directly; make it hidden")
+        self._transition = self._build_transition()
+
+    # ── Model ───────────────────────────────────────────────────────────
+
+    def _factor(self, node: str) -> tuple:
+        return self.net["cpts"][node], [self._id[v] for v in [node] + self.net["parents"][node]]
+
+    def _build_transition(self) -> np.ndarray:
+        """P(hidden_t | roots_t, hidden_t-1) as (root configs, prev configs, new configs)."""
+        args = []
+        for h in self.hidden:
+            cpt, axes = self._factor(h)
+            card = self.net["cards"][h]
+            stay = np.eye(card).reshape((card,) + (1,) * (cpt.ndim - 1) + (card,))
+            mixed = (1 - self.carry[h]) * cpt[..., None] + self.carry[h] * stay
+            args += [mixed, axes + [self._prev[h]]]
+        labels = ([self._id[r] for r in self.roots]
+                  + [self._prev[h] for h in self.hidden]
+                  + [self._id[h] for h in self.hidden])
+        tensor = np.einsum(*args, labels, optimize=True)
+        n_hidden = int(np.prod(self.shape))
+        return tensor.reshape(-1, n_hidden, n_hidden)
+
+    def initial(self, n_athletes: int) -> np.ndarray:
+        """Belief before any session: the static network's hidden prior."""
+        args = []
+        for v in self.nodes:
+            if v in self.roots or v in self.hidden:
+                args += list(self._factor(v))
+        prior = np.einsum(*args, [self._id[h] for h in self.hidden], optimize=True)
+        return np.broadcast_to(prior, (n_athletes,) + self.shape).copy()
+
+    # ── Filtering ───────────────────────────────────────────────────────
+
+    def _likelihoods(self, evidence: np.ndarray) -> dict:
+        lams = {}
+        for v in self.nodes:
+            col = evidence[:, self._id[v]]
+            if (col == MISSING).all():
+                continue
+            lam = (col[:, None] == np.arange(self.net["cards"][v])).astype(np.float64)
+            lam[col == MISSING] = 1.0
+            lams[v] = lam
+        return lams
+
+    def _emission(self, lams: dict, n: int) -> np.ndarray:
+        """(n, n_hidden configs) likelihood of the observed outputs."""
+        batch   = self._batch
+        factors = [self._factor(v) for v in self.emission]
+        factors += [(lams[v], [batch, self._id[v]]) for v in self.emission if v in lams]
+        # Sum out outputs leaves-first; each bucket is a small einsum.
+        for v in reversed(self.emission):
+            label  = self._id[v]
+            bucket = [f for f in factors if label in f[1]]
+            factors = [f for f in factors if label not in f[1]]
+            out = []
+            for _, axes in bucket:
+                out += [a for a in axes if a != label and a not in out]
+            args = []
+            for table, axes in bucket:
+                args += [table, axes]
+            factors.append((np.einsum(*args, out, optimize=True), out))
+
+        args = [np.ones(n), [batch]]
+        for table, axes in factors:
+            args += [table, axes]
+        lik = np.einsum(*args, [batch] + [self._id[h] for h in self.hidden], optimize=True)
+        return lik.reshape(n, -1)
+
+    def step(self, belief: np.ndarray, evidence) -> np.ndarray:
+        """Fold one session per athlete into the belief state.
+
+        Args:
+            belief: (n_athletes, *hidden cards) filtered beliefs.
+            evidence: One session per athlete, as codes from
+                bn_arrays.encode_evidence (MISSING where unobserved) or
+                anything it accepts.
+
+        Returns:
+            np.ndarray: The updated, normalised beliefs. Athletes whose
+            evidence is impossible under their belief come back NaN.
+        """
+        if not isinstance(evidence, np.ndarray):
+            evidence = bn_arrays.encode_evidence(self.net, evidence)
+        n = len(belief)
+        if len(evidence) != n:
+            raise ValueError(f"{len(evidence)} evidence rows for {n} beliefs")
+        lams = self._likelihoods(evidence)
+
+        # Weight of each root configuration: prior times evidence.
+        roots = np.ones((n, 1))
+        for r in self.roots:
+            w = np.broadcast_to(self.net["cpts"][r], (n, self.net["cards"][r]))
+            if r in lams:
+                w = w * lams[r]
+            roots = (roots[:, :, None] * w[:, None, :]).reshape(n, -1)
+
+        # Predict: sum_r,p roots[a,r] T[r,p,n] belief[a,p], then update with
+        # the outputs. Mixing the transition per athlete first is the fast
+        # order, so it runs over blocks of athletes to keep the (block, H, H)
+        # mixed transitions small; a single 4-operand einsum avoids them too
+        # but is several times slower.
+        n_root, n_hidden, _ = self._transition.shape
+        flat  = self._transition.reshape(n_root, -1)
+        prior = belief.reshape(n, -1)
+        post  = np.empty((n, n_hidden))
+        for start in range(0, n, BLOCK_ROWS):
+            rows  = slice(start, start + BLOCK_ROWS)
+            trans = (roots[rows] @ flat).reshape(-1, n_hidden, n_hidden)
+            post[rows] = np.einsum("ap,apn->an", prior[rows], trans)
+        post  = (post * self._emission(lams, n)).reshape((n,) + self.shape)
+        for axis, h in enumerate(self.hidden, start=1):
+            if h in lams:                      # a hidden node observed directly
+                shape = [n] + [1] * len(self.hidden)
+                shape[axis] = -1
+                post = post * lams[h].reshape(shape)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return post / post.sum(axis=tuple(range(1, post.ndim)), keepdims=True)
+
+    def run(self, sessions, belief: np.ndarray | None = None):
+        """Filter a sequence of session batches, yielding the belief after each.
+
+        Args:
+            sessions: Iterable of per-session evidence for every athlete.
+            belief: Starting beliefs; initial() sized to the first batch if
+                omitted.
+        """
+        for evidence in sessions:
+            if not isinstance(evidence, np.ndarray):
+                evidence = bn_arrays.encode_evidence(self.net, evidence)
+            if belief is None:
+                belief = self.initial(len(evidence))
+            belief = self.step(belief, evidence)
+            yield belief
+
+    def marginals(self, belief: np.ndarray) -> dict:
+        """{hidden node: (n_athletes, card)} marginals of a belief state."""
+        axes = range(1, belief.ndim)
+        return {h: belief.sum(axis=tuple(a for a in axes if a != i + 1))
+                for i, h in enumerate(self.hidden)}
@@ -0,0 +1,184 @@
+"""
+Virtual Lifter: Import-Time Report
+----------------------------------
+What each entry point costs to import from a cold interpreter, as data the
+project can check itself. Every entry point runs in a fresh subprocess
+under `python -X importtime`; the report is parsed into one record per
+module (self and cumulative microseconds, nesting depth), and modules
+already imported by a bare interpreter are left out of the totals.
+
+The regression check (--check) fails when an entry point imports one of
+its forbidden packages - pgmpy on the inference path, pandas outside the
+CSV tools, the `pddl` package in planning - or takes longer than its
+budget. Budgets are deliberately loose wall-clock limits; the forbidden
+packages are the precise part of the check.
+
+Usage:
+    python import_report.py                  # heaviest packages per entry point
+    python import_report.py app planning     # selected entry points
+    python import_report.py --check          # exit 1 on any violation
+    python import_report.py --json imports.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> statement to time, packages it must not import, import budget (ms).
+ENTRY_POINTS = {
+    "app": {
+        "code":   "import app",
+        "forbid": ["pgmpy", "pandas"],
+        "budget_ms": 2000,
+    },
+    "prob-interface": {
+        "code":   "import importlib; importlib.import_module('prob-interface')",
+        "forbid": ["pgmpy", "pandas"],
+        "budget_ms": 500,
+    },
+    "inference": {
+        "code":   ("import bn_arrays, junction_tree; "
+                   "junction_tree.JunctionTree(bn_arrays.load_network()).query_all()"),
+        "forbid": ["pgmpy", "pandas"],
+        "budget_ms": 500,
+    },
+    "inference_service": {
+        "code":   "import inference_service",
+        "forbid": ["pgmpy", "pandas"],
+        "budget_ms": 500,
+    },
+    "planning": {
+        "code":   "import planning",
+        "forbid": ["pddl", "pddl_compiler", "numpy", "pandas"],
+        "budget_ms": 250,
+    },
+}
+
+
+def parse_importtime(stderr: str) -> list:
+    """Records of a `-X importtime` report, in import order.
+
+    Returns:
+        list: [{"module", "self_us", "cumulative_us", "depth"}, ...]; depth
+        0 is a module imported directly by the timed code.
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue                                    # the header line
+        name = fields[2]
+        records.append({
+            "module":        name.strip(),
+            "self_us":       int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "depth":         (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return records
+
+
+def measure(code: str, python: str = sys.executable, cwd: str = _HERE) -> list:
+    """Run `code` in a fresh interpreter and return its import records."""
+    proc = subprocess.run([python, "-X", "importtime", "-c", code], cwd=cwd,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"{code!r} failed: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def report(name: str, spec: dict, baseline: set, repeat: int = 1) -> dict:
+    """Import report of one entry point (fastest of `repeat` cold runs).
+
+    Args:
+        baseline: Modules a bare interpreter imports anyway; excluded.
+
+    Returns:
+        dict: entry, total_ms, modules (count), top ([(package, ms), ...]
+        by cumulative import time, slowest first), forbidden (packages
+        imported against the spec) and over_budget.
+    """
+    best = None
+    for _ in range(repeat):
+        records = [r for r in measure(spec["code"]) if r["module"] not in baseline]
+        total   = sum(r["cumulative_us"] for r in records if r["depth"] == 0)
+        if best is None or total < best[0]:
+            best = (total, records)
+    total, records = best
+
+    loaded    = {r["module"] for r in records}
+    forbidden = [pkg for pkg in spec.get("forbid", [])
+                 if any(m == pkg or m.startswith(pkg + ".") for m in loaded)]
+    # A package's outermost import carries its whole cost.
+    packages = {}
+    for r in records:
+        pkg = r["module"].split(".")[0]
+        packages[pkg] = max(packages.get(pkg, 0), r["cumulative_us"] / 1000)
+    top = sorted(packages.items(), key=lambda item: -item[1])
+    total_ms = total / 1000
+    return {
+        "entry":       name,
+        "total_ms":    round(total_ms, 1),
+        "modules":     len(records),
+        "top":         [(m, round(ms, 1)) for m, ms in top],
+        "forbidden":   forbidden,
+        "over_budget": total_ms > spec.get("budget_ms", float("inf")),
+    }
+
+
+def run(names=None, repeat: int = 1) -> list:
+    """Reports for the named entry points (all of ENTRY_POINTS by default)."""
+    names = list(names or ENTRY_POINTS)
+    unknown = [n for n in names if n not in ENTRY_POINTS]
+    if unknown:
+        raise ValueError(f"Unknown entry points {unknown}; choose from {list(ENTRY_POINTS)}")
+    baseline = {r["module"] for r in measure("pass")}
+    return [report(n, ENTRY_POINTS[n], baseline, repeat) for n in names]
+
+
+def failures(reports: list) -> list:
+    """Human-readable regression-check failures (empty when all pass)."""
+    out = []
+    for r in reports:
+        if r["forbidden"]:
+            out.append(f"{r['entry']}: imports {', '.join(r['forbidden'])}")
+        if r["over_budget"]:
+            out.append(f"{r['entry']}: {r['total_ms']:.0f} ms over its "
+                       f"{ENTRY_POINTS[r['entry']]['budget_ms']} ms budget")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import report for Virtual Lifter.")
+    parser.add_argument("entries", nargs="*", help=f"entry points (default: all of {list(ENTRY_POINTS)})")
+    parser.add_argument("--check", action="store_true", help="exit 1 on forbidden imports or budgets")
+    parser.add_argument("--json", metavar="PATH", help="also write the reports as JSON")
+    parser.add_argument("--top", type=int, default=5, help="packages listed per entry point")
+    parser.add_argument("--repeat", type=int, default=3, help="cold runs per entry point (fastest kept)")
+    args = parser.parse_args()
+
+    reports = run(args.entries, args.repeat)
+    for r in reports:
+        status = "FAIL" if r["forbidden"] or r["over_budget"] else "ok"
+        print(f"{r['entry']:18s} {r['total_ms']:8.1f} ms  {r['modules']:4d} modules  [{status}]")
+        for module, ms in r["top"][:args.top]:
+            print(f"    {module:28s} {ms:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    problems = failures(reports)
+    for p in problems:
+        print(f"[FAIL] {p}")
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
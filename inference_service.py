@@ -0,0 +1,331 @@
+"""
+Virtual Lifter: Posterior Inference Service
+-------------------------------------------
+A standalone HTTP/JSON front end to the Bayesian Network, built on the
+standard library only (asyncio streams + a process pool; numpy for the
+maths).
+
+Endpoints:
+    GET  /health            {"status": "ok", "model": <network hash>}
+    POST /posterior         {"evidence": {var: state, ...}, "variables": [...]}
+                            -> {"posteriors": {var: {state: prob}}}
+    POST /posterior/batch   {"evidence": [{...}, ...], "variables": [...]}
+                            -> {"posteriors": [{var: {state: prob}} | null, ...]}
+
+Evidence may name any subset of the 11 variables; "variables" is optional
+and defaults to all of them. Rows whose evidence is impossible come back
+as null.
+
+Single queries are coalesced: they wait in a queue for at most
+--max-delay-ms (or until --max-batch are waiting) and are then answered by
+one batched contraction (batch_inference.BatchEngine). All contractions run
+on a process pool whose workers load the network once, so the event loop
+only parses, queues and serialises.
+
+Usage:
+    python inference_service.py --port 8350 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import bn_arrays
+
+MAX_BODY    = 16 * 1024 * 1024
+MAX_HEADERS = 100        # header lines are also capped by the stream limit (64 KiB)
+REASONS  = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large",
+            500: "Internal Server Error"}
+
+_ENGINE = None
+
+
+# ── Worker side ─────────────────────────────────────────────────────────
+
+def _init_worker(path: str = bn_arrays.MODEL_FILE) -> None:
+    global _ENGINE
+    from batch_inference import BatchEngine
+
+    _ENGINE = BatchEngine(bn_arrays.load_network(path))
+
+
+def _infer(codes: np.ndarray) -> np.ndarray:
+    if _ENGINE is None:
+        _init_worker()
+    return _ENGINE.posteriors(codes)
+
+
+# ── Batching ────────────────────────────────────────────────────────────
+
+class MicroBatcher:
+    """Coalesces single evidence rows into batched pool calls."""
+
+    def __init__(self, executor, max_batch: int = 256, max_delay: float = 0.002):
+        self.executor  = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending  = []
+        self._timer    = None
+        self.stats     = {"rows": 0, "batches": 0}
+
+    def submit(self, row: np.ndarray) -> asyncio.Future:
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: list) -> None:
+        loop  = asyncio.get_running_loop()
+        codes = np.stack([row for row, _ in batch])
+        self.stats["rows"]    += len(batch)
+        self.stats["batches"] += 1
+        try:
+            probs = await loop.run_in_executor(self.executor, _infer, codes)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), row in zip(batch, probs):
+            if not future.done():
+                future.set_result(row)
+
+
+# ── HTTP front end ──────────────────────────────────────────────────────
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class InferenceService:
+    """Routes HTTP requests to the batcher / pool."""
+
+    def __init__(self, net, executor, max_batch: int = 256, max_delay: float = 0.002,
+                 batch_chunk: int = 4096):
+        self.net         = net
+        self.nodes       = list(net["nodes"])
+        self.hash        = bn_arrays.network_hash(net)
+        self.executor    = executor
+        self.batcher     = MicroBatcher(executor, max_batch, max_delay)
+        self.batch_chunk = batch_chunk
+
+    # ── Encoding ──
+
+    def _encode(self, rows: list) -> np.ndarray:
+        for row in rows:
+            if not isinstance(row, dict):
+                raise RequestError(400, "Evidence rows must be JSON objects")
+            for var, state in row.items():
+                if var not in self.net["states"]:
+                    raise RequestError(400, f"Unknown variable {var!r}")
+                if state not in self.net["states"][var]:
+                    raise RequestError(400, f"Unknown state {state!r} for {var!r}; "
+                                            f"expected one of {self.net['states'][var]}")
+        return bn_arrays.encode_evidence(self.net, rows)
+
+    def _variables(self, payload: dict) -> list:
+        variables = payload.get("variables") or self.nodes
+        if not isinstance(variables, list) or not all(isinstance(v, str) for v in variables):
+            raise RequestError(400, '"variables" must be a list of variable names')
+        unknown   = [v for v in variables if v not in self.net["states"]]
+        if unknown:
+            raise RequestError(400, f"Unknown variables {unknown}")
+        return variables
+
+    def _format(self, row: np.ndarray, variables: list):
+        if np.isnan(row).any():
+            return None
+        out = {}
+        for var in variables:
+            i = self.nodes.index(var)
+            out[var] = dict(zip(self.net["states"][var], row[i].tolist()))
+        return out
+
+    # ── Routes ──
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple:
+        if path == "/health":
+            if method != "GET":
+                raise RequestError(405, "Use GET")
+            return 200, {"status": "ok", "model": self.hash, "batching": self.batcher.stats}
+        if path not in ("/posterior", "/posterior/batch"):
+            raise RequestError(404, f"No route {path}")
+        if method != "POST":
+            raise RequestError(405, "Use POST")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            raise RequestError(400, f"Invalid JSON: {exc}") from None
+        if not isinstance(payload, dict):
+            raise RequestError(400, "Body must be a JSON object")
+        variables = self._variables(payload)
+
+        if path == "/posterior":
+            codes = self._encode([payload.get("evidence") or {}])
+            row   = await self.batcher.submit(codes[0])
+            result = self._format(row, variables)
+            if result is None:
+                raise RequestError(400, "Evidence has zero probability")
+            return 200, {"posteriors": result}
+
+        rows = payload.get("evidence")
+        if not isinstance(rows, list):
+            raise RequestError(400, '"evidence" must be a list of objects')
+        codes = self._encode(rows)
+        loop  = asyncio.get_running_loop()
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _infer, codes[i:i + self.batch_chunk])
+            for i in range(0, len(codes), self.batch_chunk)
+        ))
+        probs = np.concatenate(parts) if parts else np.empty((0,))
+        return 200, {"posteriors": [self._format(row, variables) for row in probs]}
+
+    # ── Connection handling ──
+
+    @staticmethod
+    async def _read_head(reader):
+        """(method, target, version, headers) of the next request; None at EOF.
+
+        Raises RequestError for a malformed or oversized request head.
+        """
+        try:
+            line = await reader.readline()
+        except ValueError:                       # over the stream limit
+            raise RequestError(400, "Request line too long") from None
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError(400, "Malformed request line") from None
+
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            try:
+                header = await reader.readline()
+            except ValueError:
+                raise RequestError(431, "Header line too long") from None
+            if header in (b"\r\n", b"\n", b""):
+                return method, target, version, headers
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise RequestError(431, f"More than {MAX_HEADERS} headers")
+
+    @staticmethod
+    async def _respond(writer, status: int, payload: dict, keep_alive: bool) -> None:
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+            + data
+        )
+        await writer.drain()
+
+    async def handle(self, reader, writer) -> None:
+        try:
+            while True:
+                try:
+                    head = await self._read_head(reader)
+                except RequestError as exc:
+                    await self._respond(writer, exc.status, {"error": str(exc)}, False)
+                    break
+                if head is None:
+                    break
+                method, target, version, headers = head
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = 400, {"error": "Invalid Content-Length"}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, payload = 413, {"error": f"Body over {MAX_BODY} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, payload = await self.route(method, target.split("?")[0], body)
+                    except RequestError as exc:
+                        status, payload = exc.status, {"error": str(exc)}
+                    except Exception as exc:
+                        status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8350, workers: int | None = None,
+                max_batch: int = 256, max_delay: float = 0.002) -> None:
+    """Run the service until cancelled.
+
+    Args:
+        workers: Inference processes; None uses every CPU, 0 runs inference
+            on a single background thread in this process instead.
+    """
+    net = bn_arrays.load_network()   # also (re)writes the artefact workers load
+    if workers == 0:
+        executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    service = InferenceService(net, executor, max_batch, max_delay)
+    server  = await asyncio.start_server(service.handle, host, port)
+    print(f"Virtual Lifter inference service on http://{host}:{port} "
+          f"(model {service.hash[:12]}, {workers if workers is not None else os.cpu_count()} "
+          f"workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Virtual Lifter posteriors over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8350)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="inference processes (default: one per CPU; 0 = in-process thread)")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers,
+                          args.max_batch, args.max_delay_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
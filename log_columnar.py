@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+log_columnar.py  -  Vectorised Lifting-Log Generator
+=====================================================
+Columnar counterpart of `planning.generate_logs`. Instead of building one
+15-key dict per row, the programme is laid out as NumPy arrays over
+athletes x weeks x (sessions x exercises):
+
+  * per-week arrays hold block label, block week, deload mask, intensity
+    ramp, sets/reps/RPE,
+  * a per-row template holds day, focus, exercise and lift for one week,
+  * 1RM compounding (`weekly_gain`) runs once per week for every athlete
+    at the same time, and bar rounding is a single vector operation.
+
+The result is a NumPy structured array with the CSV_FIELDS columns plus an
+"Athlete" index (wrap it in `pandas.DataFrame` if a frame is preferred).
+`write_columns_csv` writes it byte-for-byte identically to the CSV that
+`planning.main` produces from `generate_logs`.
+
+Usage:
+    python log_columnar.py [n_athletes]     # timing vs generate_logs
+"""
+
+import csv
+import sys
+import time
+
+import numpy as np
+
+import planning
+
+# Which USER field seeds each main lift's estimated 1RM.
+ONE_RM_FIELDS = {
+    "Squat":       "current_squat_1rm",
+    "Bench Press": "current_bench_1rm",
+    "Deadlift":    "current_deadlift_1rm",
+}
+
+_ACCESSORY = {"sets": 3, "reps": 12, "pct": 0.50, "rpe": 7}
+
+
+def _round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    `np.round` that agrees with Python's `round(x, ndigits)` on every element.
+
+    np.round scales by 10**ndigits before rounding, which can land on a
+    spurious .5 tie; the few elements that come close to a tie are
+    re-rounded with the built-in so output matches `generate_logs` exactly.
+    """
+    out    = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near   = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near.any():
+        out[near] = [round(v, ndigits) for v in values[near].tolist()]
+    return out
+
+
+def _round_weight(weight_kg: np.ndarray, increment: float = 2.5) -> np.ndarray:
+    """Vector form of `planning._round_weight` (half-to-even, like round())."""
+    return np.rint(weight_kg / increment) * increment
+
+
+def _week_table(plan: list) -> dict:
+    """Per-week block parameters, in the same order generate_logs walks them."""
+    labels, block_week, deload, pct, sets, reps, rpe, gain = ([] for _ in range(8))
+    for action in plan:
+        cfg = planning.BLOCK_CONFIG[action]
+        for bw in range(1, cfg["weeks"] + 1):
+            is_deload = (bw % 4 == 0) and cfg["weeks"] >= 4
+            progress  = (bw - 1) / max(cfg["weeks"] - 1, 1)
+            p         = cfg["intensity_low"] + progress * (
+                cfg["intensity_high"] - cfg["intensity_low"]
+            )
+            if is_deload:
+                p *= 0.85
+            labels.append(cfg["label"])
+            block_week.append(bw)
+            deload.append(is_deload)
+            pct.append(p)
+            sets.append(max(2, cfg["sets"] - (1 if is_deload else 0)))
+            reps.append(cfg["reps"] + (2 if is_deload else 0))
+            rpe.append(cfg["rpe"] - (1 if is_deload else 0))
+            gain.append(cfg["weekly_gain"])
+    return {
+        "label":      np.array(labels, dtype=object),
+        "block_week": np.array(block_week, dtype=np.int32),
+        "deload":     np.array(deload, dtype=bool),
+        "pct":        np.array(pct, dtype=np.float64),
+        "sets":       np.array(sets, dtype=np.int32),
+        "reps":       np.array(reps, dtype=np.int32),
+        "rpe":        np.array(rpe, dtype=np.int32),
+        "gain":       np.array(gain, dtype=np.float64),
+    }
+
+
+def _row_template() -> dict:
+    """One week's rows (main lift then its accessories, per session)."""
+    day, focus, exercise, main, lift, offset = ([] for _ in range(6))
+    for sess in planning.WEEKLY_SCHEDULE:
+        lift_idx = planning.MAIN_LIFTS.index(sess["main"])
+        for name, is_main in [(sess["main"], True)] + [
+            (acc, False) for acc in planning.ACCESSORIES[sess["main"]]
+        ]:
+            day.append(sess["day"])
+            focus.append(sess["focus"])
+            exercise.append(name)
+            main.append(is_main)
+            lift.append(lift_idx)
+            offset.append(planning._DAY_OFFSET[sess["day"]])
+    return {
+        "day":      np.array(day, dtype=object),
+        "focus":    np.array(focus, dtype=object),
+        "exercise": np.array(exercise, dtype=object),
+        "main":     np.array(main, dtype=bool),
+        "lift":     np.array(lift, dtype=np.intp),
+        "offset":   np.array(offset, dtype=np.int64),
+    }
+
+
+def _dtype(weeks: dict, rows: dict) -> np.dtype:
+    def width(*arrays):
+        return max((len(s) for a in arrays for s in a), default=1)
+
+    return np.dtype([
+        ("Athlete",       np.int32),
+        ("Week",          np.int32),
+        ("Date",          "datetime64[D]"),
+        ("Block",         f"U{width(weeks['label'])}"),
+        ("Block_Week",    np.int32),
+        ("Is_Deload",     bool),
+        ("Day",           f"U{width(rows['day'])}"),
+        ("Focus",         f"U{width(rows['focus'])}"),
+        ("Exercise",      f"U{width(rows['exercise'])}"),
+        ("Exercise_Type", "U9"),
+        ("Sets",          np.int32),
+        ("Reps",          np.int32),
+        ("Weight_kg",     np.float64),
+        ("Intensity_Pct", np.float64),
+        ("RPE_Target",    np.int32),
+        ("Est_1RM_kg",    np.float64),
+        # Formatting flag: the 1RM is still the athlete's raw int input, which
+        # generate_logs writes without a decimal point.
+        ("_est_int",      bool),
+    ])
+
+
+def build_template(plan: list) -> dict:
+    """
+    Everything about a programme that does not depend on the athlete:
+    per-week block parameters, the weekly row layout and the output dtype.
+    """
+    weeks = _week_table(plan)
+    rows  = _row_template()
+    return {"weeks": weeks, "rows": rows, "dtype": _dtype(weeks, rows)}
+
+
+def generate_log_columns(plan: list, users: list) -> np.ndarray:
+    """
+    Expand one plan for many athletes into a structured array.
+
+    Parameters
+    ----------
+    plan  : list of str   – ordered PDDL action names (BLOCK_CONFIG keys)
+    users : list of dict  – athlete profiles with the same keys as planning.USER
+
+    Returns
+    -------
+    np.ndarray (structured) with one record per generate_logs row, ordered
+    athlete by athlete; fields are CSV_FIELDS plus "Athlete" (index into
+    `users`) and the private "_est_int" formatting flag.
+    """
+    return expand_template(build_template(plan), users)
+
+
+def expand_template(template: dict, users: list) -> np.ndarray:
+    """Fill a `build_template` result with each athlete's 1RMs and dates."""
+    weeks, rows = template["weeks"], template["rows"]
+    n_a, n_w, n_r = len(users), len(weeks["pct"]), len(rows["day"])
+    out   = np.empty(n_a * n_w * n_r, dtype=template["dtype"])
+    if out.size == 0:
+        return out
+
+    # 1RM trajectories: one_rm[a, w, lift] is the estimate used during week w.
+    start  = np.array([[u[ONE_RM_FIELDS[l]] for l in planning.MAIN_LIFTS] for u in users],
+                      dtype=np.float64)
+    is_int = np.array([[isinstance(u[ONE_RM_FIELDS[l]], int) for l in planning.MAIN_LIFTS]
+                       for u in users], dtype=bool)
+    one_rm = np.empty((n_a, n_w, len(planning.MAIN_LIFTS)))
+    raw    = np.zeros((n_w,), dtype=bool)   # week still uses the raw input values
+    current, compounded = start, False
+    for w in range(n_w):
+        one_rm[:, w] = current
+        raw[w]       = not compounded
+        if not weeks["deload"][w]:
+            current    = _round_like_python(current * (1 + weeks["gain"][w]), 2)
+            compounded = True
+
+    # Broadcast everything to (athlete, week, row).
+    lift_rm = one_rm[:, :, rows["lift"]]                            # (A, W, R)
+    pct     = np.where(rows["main"], weeks["pct"][:, None], _ACCESSORY["pct"])
+    main    = rows["main"][None, :]
+
+    anchor = np.array([np.datetime64(u["start_date"], "D") for u in users])
+    weekday = (anchor.astype(np.int64) + 3) % 7                     # 1970-01-01 was a Thursday
+    monday  = anchor + ((7 - weekday) % 7)
+    dates   = (monday[:, None, None]
+               + (np.arange(n_w) * 7)[None, :, None]
+               + rows["offset"][None, None, :])
+
+    shape = (n_a, n_w, n_r)
+    cols = {
+        "Athlete":       np.broadcast_to(np.arange(n_a)[:, None, None], shape),
+        "Week":          np.broadcast_to(np.arange(1, n_w + 1)[None, :, None], shape),
+        "Date":          dates,
+        "Block":         np.broadcast_to(weeks["label"][None, :, None], shape),
+        "Block_Week":    np.broadcast_to(weeks["block_week"][None, :, None], shape),
+        "Is_Deload":     np.broadcast_to(weeks["deload"][None, :, None], shape),
+        "Day":           np.broadcast_to(rows["day"][None, None, :], shape),
+        "Focus":         np.broadcast_to(rows["focus"][None, None, :], shape),
+        "Exercise":      np.broadcast_to(rows["exercise"][None, None, :], shape),
+        "Exercise_Type": np.broadcast_to(np.where(rows["main"], "Main", "Accessory")[None, None, :],
+                                         shape),
+        "Sets":          np.where(main, weeks["sets"][:, None], _ACCESSORY["sets"])[None],
+        "Reps":          np.where(main, weeks["reps"][:, None], _ACCESSORY["reps"])[None],
+        "Weight_kg":     _round_weight(lift_rm * pct[None]),
+        "Intensity_Pct": _round_like_python(pct * 100, 1)[None],
+        "RPE_Target":    np.where(main, weeks["rpe"][:, None], _ACCESSORY["rpe"])[None],
+        "Est_1RM_kg":    _round_like_python(lift_rm, 1),
+        "_est_int":      is_int[:, None, rows["lift"]] & raw[None, :, None],
+    }
+    for name, values in cols.items():
+        out[name] = np.broadcast_to(values, shape).reshape(-1)
+    return out
+
+
+def _format_column(arr: np.ndarray, name: str) -> list:
+    """String form of one column, matching csv.DictWriter on generate_logs rows."""
+    if name == "Date":
+        return np.datetime_as_string(arr["Date"], unit="D").tolist()
+    if name == "Est_1RM_kg":
+        values = arr["Est_1RM_kg"].tolist()
+        flags  = arr["_est_int"].tolist()
+        return [str(int(v)) if f else str(v) for v, f in zip(values, flags)]
+    return [str(v) for v in arr[name].tolist()]
+
+
+def write_columns_csv(arr: np.ndarray, f, fields: list | None = None,
+                      header: bool = True, athlete_ids: list | None = None) -> None:
+    """
+    Write a structured log array to an open text file as CSV.
+
+    If `athlete_ids` is given, a leading "athlete_id" column is written with
+    athlete_ids[record["Athlete"]] for every row.
+    """
+    fields  = planning.CSV_FIELDS if fields is None else fields
+    columns = [_format_column(arr, name) for name in fields]
+    if athlete_ids is not None:
+        ids     = np.array([str(a) for a in athlete_ids] or [""], dtype=object)
+        fields  = ["athlete_id"] + list(fields)
+        columns = [ids[arr["Athlete"]].tolist()] + columns
+
+    writer = csv.writer(f, lineterminator="\r\n")
+    if header:
+        writer.writerow(fields)
+    writer.writerows(zip(*columns))
+
+
+def main():
+    n_athletes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    plan  = ["do-base-block", "do-hypertrophy-block", "do-peaking-block"]
+    users = [
+        dict(planning.USER,
+             current_squat_1rm=80 + i % 60,
+             current_bench_1rm=60 + i % 50,
+             current_deadlift_1rm=100 + i % 80)
+        for i in range(n_athletes)
+    ]
+
+    t0 = time.perf_counter()
+    for u in users:
+        planning.generate_logs(plan, u)
+    t_rows = time.perf_counter() - t0
+
+    t0  = time.perf_counter()
+    arr = generate_log_columns(plan, users)
+    t_cols = time.perf_counter() - t0
+
+    print(f"{n_athletes} athletes, {arr.size:,} rows")
+    print(f"  generate_logs        : {t_rows:8.3f} s")
+    print(f"  generate_log_columns : {t_cols:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
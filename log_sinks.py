@@ -0,0 +1,176 @@
+"""
+log_sinks.py  -  Streaming Exporters for Lifting Logs
+======================================================
+Incremental writers for the row dicts produced by `planning.iter_logs`.
+
+Rows flow through in fixed-size batches (see `planning.iter_log_batches`
+and `iter_roster_batches` below), and each sink writes a batch and drops
+it, so memory stays bounded by the batch size no matter how many weeks or
+athletes are generated.
+
+    CsvSink      - same format as planning.main's csv.DictWriter output
+    ParquetSink  - one row group per batch; the low-cardinality Block, Day,
+                   Exercise and Focus columns are dictionary-encoded
+                   (requires pyarrow)
+
+Roster streams carry an extra leading athlete_id column, so open their
+sinks with ROSTER_FIELDS:
+
+    with ParquetSink("logs.parquet", ROSTER_FIELDS) as sink:
+        write_batches(iter_roster_batches(roster), sink)
+"""
+
+import csv
+from datetime import date
+
+import planning
+
+DICTIONARY_COLUMNS = ("Block", "Day", "Exercise", "Focus")
+
+# Columns of iter_roster_batches rows.
+ROSTER_FIELDS = ["athlete_id"] + planning.CSV_FIELDS
+
+
+class CsvSink:
+    """Append row batches to a CSV file, writing the header once."""
+
+    def __init__(self, path: str, fields: list | None = None):
+        self.fields  = list(planning.CSV_FIELDS if fields is None else fields)
+        self._file   = open(path, "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fields)
+        self._writer.writeheader()
+        self.rows    = 0
+
+    def write_batch(self, rows: list) -> None:
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """Append row batches to a Parquet file as successive row groups."""
+
+    def __init__(self, path: str, fields: list | None = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow") from exc
+
+        self._pa    = pa
+        self.fields = list(planning.CSV_FIELDS if fields is None else fields)
+        types = {
+            "athlete_id":    pa.string(),
+            "Week":          pa.int32(),
+            "Date":          pa.date32(),
+            "Block_Week":    pa.int32(),
+            "Is_Deload":     pa.bool_(),
+            "Exercise_Type": pa.string(),
+            "Sets":          pa.int32(),
+            "Reps":          pa.int32(),
+            "Weight_kg":     pa.float64(),
+            "Intensity_Pct": pa.float64(),
+            "RPE_Target":    pa.int32(),
+            "Est_1RM_kg":    pa.float64(),
+        }
+        for name in DICTIONARY_COLUMNS:
+            types[name] = pa.dictionary(pa.int32(), pa.string())
+
+        self.schema  = pa.schema([(name, types[name]) for name in self.fields])
+        self._writer = pq.ParquetWriter(
+            path, self.schema,
+            use_dictionary=[n for n in self.fields if n in DICTIONARY_COLUMNS],
+        )
+        self.rows = 0
+
+    def write_batch(self, rows: list) -> None:
+        if not rows:
+            return
+        columns = {}
+        for name in self.fields:
+            values = [row[name] for row in rows]
+            if name == "Date":
+                values = [date.fromisoformat(v) for v in values]
+            elif name == "athlete_id":
+                values = [str(v) for v in values]
+            columns[name] = values
+        batch = self._pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(path: str, fields: list | None = None):
+    """Pick a sink from the file extension (.parquet / .pq, otherwise CSV)."""
+    if path.endswith((".parquet", ".pq")):
+        return ParquetSink(path, fields)
+    return CsvSink(path, fields)
+
+
+def write_batches(batches, sink) -> int:
+    """
+    Drain an iterable of row batches into `sink`; returns rows written.
+
+    Raises ValueError before writing if the first row's columns differ
+    from the sink's fields (e.g. roster rows into a sink opened without
+    ROSTER_FIELDS), instead of failing mid-file or dropping a column.
+    """
+    checked = False
+    for batch in batches:
+        if not checked and batch:
+            extra   = [k for k in batch[0] if k not in sink.fields]
+            missing = [k for k in sink.fields if k not in batch[0]]
+            if extra or missing:
+                raise ValueError(f"Rows do not match the sink's fields "
+                                 f"(extra: {extra}, missing: {missing})")
+            checked = True
+        sink.write_batch(batch)
+    return sink.rows
+
+
+def iter_roster_batches(roster: list, planner=None, batch_size: int = 10_000):
+    """
+    Stream every athlete's programme as row batches with an athlete_id column
+    (write them to a sink opened with ROSTER_FIELDS).
+
+    Parameters
+    ----------
+    roster     : list of dict  – athlete profiles (see roster.load_roster)
+    planner    : callable      – user -> plan; defaults to roster.plan_athlete
+    batch_size : int           – maximum rows per yielded batch
+
+    Athletes with no valid plan are skipped.
+    """
+    if planner is None:
+        from roster import plan_athlete as planner
+
+    batch = []
+    for i, user in enumerate(roster):
+        plan = planner(user)
+        if plan is None:
+            continue
+        athlete_id = user.get("athlete_id", i)
+        for row in planning.iter_logs(plan, user):
+            row["athlete_id"] = athlete_id
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+pddl_compiler.py  -  Native PDDL Loader / Grounder
+===================================================
+A small, dependency-free reader for the STRIPS subset of PDDL used by the
+gym planner (:strips, :typing, :negative-preconditions, :equality).
+
+It parses gym_domain.pddl / gym_problem.pddl, grounds every action over the
+typed problem objects and compiles the result into the same action dicts
+the planners in planning.py consume ("name", "pre", "neg_pre", "add",
+"del"). Static predicates (never touched by an effect) are evaluated at
+grounding time, so the compiled actions only mention fluent atoms.
+
+Ground atoms and action names are space-separated strings: a zero-arity
+predicate `(base-built)` becomes "base-built" and `(done squat peak)`
+becomes "done squat peak", so the current domain compiles to exactly the
+names used by `_STRIPS_ACTIONS` and `BLOCK_CONFIG`.
+
+Goals must be conjunctions of positive atoms: the planners only test that
+the goal atoms hold, so a problem with a negated goal literal is rejected
+rather than silently solved without it.
+
+Compiled tasks are cached on disk under .pddl_cache/, keyed by a hash of
+both files, so repeated CLI runs skip parsing and grounding entirely. The
+directory keeps at most MAX_CACHE_FILES tasks; the least recently used are
+deleted when a new one is written.
+
+Usage:
+    python pddl_compiler.py [domain.pddl] [problem.pddl]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from itertools import product
+
+CACHE_DIR       = ".pddl_cache"
+MAX_CACHE_FILES = 64
+_CACHE_VERSION  = 2
+
+_SUPPORTED_REQUIREMENTS = {
+    ":strips", ":typing", ":negative-preconditions", ":equality",
+}
+
+
+# ── S-expression reader ─────────────────────────────────────────────────
+
+def _tokenize(text: str) -> list:
+    text = re.sub(r";[^\n]*", "", text).lower()
+    return re.findall(r"\(|\)|[^\s()]+", text)
+
+
+def _parse_sexpr(text: str):
+    tokens = _tokenize(text)
+    stack  = [[]]
+    for tok in tokens:
+        if tok == "(":
+            stack.append([])
+        elif tok == ")":
+            if len(stack) == 1:
+                raise ValueError("Unbalanced ')' in PDDL input")
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            stack[-1].append(tok)
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError("PDDL input must contain exactly one balanced (define ...) form")
+    return stack[0][0]
+
+
+def _sections(define: list, kind: str):
+    """Split a (define (kind name) ...) form into (name, {":keyword": body})."""
+    if not define or define[0] != "define" or define[1][0] != kind:
+        raise ValueError(f"Expected (define ({kind} <name>) ...)")
+    name     = define[1][1]
+    sections = {}
+    for part in define[2:]:
+        if isinstance(part, list) and part and part[0].startswith(":"):
+            sections[part[0]] = part[1:]
+    return name, sections
+
+
+def _typed_list(items: list) -> list:
+    """Parse `a b - t c` into [(a, t), (b, t), (c, "object")]."""
+    result, pending = [], []
+    i = 0
+    while i < len(items):
+        if items[i] == "-":
+            typ = items[i + 1]
+            if isinstance(typ, list):          # (either t1 t2)
+                typ = tuple(typ[1:])
+            result += [(name, typ) for name in pending]
+            pending = []
+            i += 2
+        else:
+            pending.append(items[i])
+            i += 1
+    result += [(name, "object") for name in pending]
+    return result
+
+
+def _literals(expr: list) -> tuple:
+    """Flatten a conjunction of literals into (positive, negative) atom templates."""
+    pos, neg = [], []
+    if not expr:
+        return pos, neg
+    head = expr[0]
+    if head == "and":
+        for sub in expr[1:]:
+            p, n = _literals(sub)
+            pos += p
+            neg += n
+    elif head == "not":
+        inner = expr[1]
+        if inner and inner[0] in ("and", "or", "not", "imply", "forall", "exists", "when"):
+            raise ValueError(f"Unsupported negated formula: {inner[0]!r}")
+        neg.append(tuple(inner))
+    elif head in ("or", "imply", "forall", "exists", "when"):
+        raise ValueError(f"Unsupported PDDL construct {head!r}")
+    else:
+        pos.append(tuple(expr))
+    return pos, neg
+
+
+# ── Domain / problem parsing ────────────────────────────────────────────
+
+def parse_domain(text: str) -> dict:
+    define    = _parse_sexpr(text)
+    name, sec = _sections(define, "domain")
+
+    unsupported = set(sec.get(":requirements", [])) - _SUPPORTED_REQUIREMENTS
+    if unsupported:
+        raise ValueError(f"Unsupported requirements: {sorted(unsupported)}")
+
+    parents = {"object": None}
+    for child, parent in _typed_list(sec.get(":types", [])):
+        parents[child] = parent
+        parents.setdefault(parent, "object" if parent != "object" else None)
+
+    predicates = {}
+    for pred in sec.get(":predicates", []):
+        predicates[pred[0]] = [t for _, t in _typed_list(pred[1:])]
+
+    actions = []
+    for part in define[2:]:
+        if not (isinstance(part, list) and part and part[0] == ":action"):
+            continue
+        fields = dict(zip(part[2::2], part[3::2]))
+        pre_pos, pre_neg = _literals(fields.get(":precondition", []))
+        eff_add, eff_del = _literals(fields.get(":effect", []))
+        actions.append({
+            "name":       part[1],
+            "parameters": _typed_list(fields.get(":parameters", [])),
+            "pre":        pre_pos,
+            "neg_pre":    pre_neg,
+            "add":        eff_add,
+            "del":        eff_del,
+        })
+
+    return {
+        "name":       name,
+        "types":      parents,
+        "constants":  _typed_list(sec.get(":constants", [])),
+        "predicates": predicates,
+        "actions":    actions,
+    }
+
+
+def parse_problem(text: str) -> dict:
+    name, sec = _sections(_parse_sexpr(text), "problem")
+    goal_pos, goal_neg = _literals(sec[":goal"][0] if sec.get(":goal") else [])
+    return {
+        "name":     name,
+        "domain":   sec[":domain"][0] if sec.get(":domain") else None,
+        "objects":  _typed_list(sec.get(":objects", [])),
+        "init":     [tuple(atom) for atom in sec.get(":init", [])],
+        "goal":     goal_pos,
+        "goal_neg": goal_neg,
+    }
+
+
+# ── Grounding ───────────────────────────────────────────────────────────
+
+def _atom(template: tuple, binding: dict) -> str:
+    return " ".join([template[0]] + [binding.get(a, a) for a in template[1:]])
+
+
+def _is_subtype(typ: str, target, parents: dict) -> bool:
+    if isinstance(target, tuple):              # (either ...)
+        return any(_is_subtype(typ, t, parents) for t in target)
+    while typ is not None:
+        if typ == target:
+            return True
+        typ = parents.get(typ)
+    return False
+
+
+def ground(domain: dict, problem: dict) -> dict:
+    """
+    Ground a parsed domain/problem pair into planner-ready STRIPS tables.
+
+    Returns
+    -------
+    dict with "actions" (list of action dicts with frozenset fields),
+    "init" and "goal" (sets of atoms).
+    """
+    if problem["goal_neg"]:
+        raise ValueError("Negative goal literals are not supported by the planners: "
+                         + ", ".join(f"(not ({_atom(t, {})}))" for t in problem["goal_neg"]))
+    if problem["domain"] not in (None, domain["name"]):
+        raise ValueError(f'Problem is for domain {problem["domain"]!r}, '
+                         f'not {domain["name"]!r}')
+
+    objects = domain["constants"] + problem["objects"]
+    parents = domain["types"]
+
+    fluent = {t[0] for a in domain["actions"] for t in a["add"] + a["del"]}
+    init   = {_atom(t, {}) for t in problem["init"]}
+
+    def holds_static(templates, binding, positive):
+        for t in templates:
+            if t[0] == "=":
+                equal = binding.get(t[1], t[1]) == binding.get(t[2], t[2])
+                if equal != positive:
+                    return False
+            elif t[0] not in fluent and (_atom(t, binding) in init) != positive:
+                return False
+        return True
+
+    def fluents(templates, binding):
+        return frozenset(_atom(t, binding) for t in templates
+                         if t[0] != "=" and t[0] in fluent)
+
+    actions = []
+    for act in domain["actions"]:
+        params  = [p for p, _ in act["parameters"]]
+        choices = [
+            [obj for obj, otyp in objects if _is_subtype(otyp, ptyp, parents)]
+            for _, ptyp in act["parameters"]
+        ]
+        for values in product(*choices):
+            binding = dict(zip(params, values))
+            if not (holds_static(act["pre"], binding, True)
+                    and holds_static(act["neg_pre"], binding, False)):
+                continue
+            actions.append({
+                "name":    " ".join([act["name"], *values]),
+                "pre":     fluents(act["pre"], binding),
+                "neg_pre": fluents(act["neg_pre"], binding),
+                "add":     fluents(act["add"], binding),
+                "del":     fluents(act["del"], binding),
+            })
+
+    return {
+        "actions":  actions,
+        "init":     init,
+        "goal":     {_atom(t, {}) for t in problem["goal"]},
+    }
+
+
+# ── Disk cache ──────────────────────────────────────────────────────────
+
+def _to_json(task: dict) -> dict:
+    return {
+        "actions":  [{k: (sorted(v) if isinstance(v, frozenset) else v)
+                      for k, v in a.items()} for a in task["actions"]],
+        "init":     sorted(task["init"]),
+        "goal":     sorted(task["goal"]),
+    }
+
+
+def _from_json(data: dict) -> dict:
+    return {
+        "actions":  [{k: (frozenset(v) if isinstance(v, list) else v)
+                      for k, v in a.items()} for a in data["actions"]],
+        "init":     set(data["init"]),
+        "goal":     set(data["goal"]),
+    }
+
+
+def load_strips(domain_path: str = "gym_domain.pddl",
+                problem_path: str = "gym_problem.pddl",
+                cache_dir: str | None = CACHE_DIR) -> dict:
+    """
+    Read, ground and compile a PDDL domain/problem pair.
+
+    The compiled task is cached as JSON in `cache_dir` under the SHA-256 of
+    both files' contents (at most MAX_CACHE_FILES are kept); pass
+    cache_dir=None to always recompile.
+    """
+    with open(domain_path, "rb") as f:
+        domain_bytes = f.read()
+    with open(problem_path, "rb") as f:
+        problem_bytes = f.read()
+
+    digest = hashlib.sha256(
+        b"%d\0%b\0%b" % (_CACHE_VERSION, domain_bytes, problem_bytes)
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}.json") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                task = _from_json(json.load(f))
+            os.utime(cache_path)        # mark as recently used for pruning
+            return task
+        except (OSError, ValueError, KeyError):
+            pass                        # pruned meanwhile or unreadable: recompile
+
+    task = ground(parse_domain(domain_bytes.decode()),
+                  parse_problem(problem_bytes.decode()))
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(_to_json(task), f)
+        os.replace(tmp_path, cache_path)
+        _prune_cache(cache_dir)
+
+    return task
+
+
+def _prune_cache(cache_dir: str, keep: int = MAX_CACHE_FILES) -> None:
+    """Delete all but the `keep` most recently used cached tasks."""
+    entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def main():
+    domain_path  = sys.argv[1] if len(sys.argv) > 1 else "gym_domain.pddl"
+    problem_path = sys.argv[2] if len(sys.argv) > 2 else "gym_problem.pddl"
+    task = load_strips(domain_path, problem_path)
+
+    print(f"[ACTIONS]  {len(task['actions'])} ground action(s)")
+    for a in task["actions"]:
+        print(f'  {a["name"]:28s} pre={sorted(a["pre"])} neg={sorted(a["neg_pre"])}'
+              f' add={sorted(a["add"])} del={sorted(a["del"])}')
+    print(f"[INIT]     {sorted(task['init'])}")
+    print(f"[GOAL]     {sorted(task['goal'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,23 @@
 """
 planning.py  -  AI Gym Planner
 ================================
-Uses the `pddl` package to build a
-STRIPS planning domain and problem modelling a strength-training macrocycle.
-A built-in forward BFS planner resolves the action sequence, which is then
-expanded into a full week-by-week lifting programme exported to lifting_logs.csv.
+Builds a STRIPS planning domain and problem modelling a strength-training
+macrocycle (optionally with the `pddl` package), compiles the saved PDDL
+files back into grounded actions with pddl_compiler.py, and searches them
+for the shortest macrocycle in weeks (bitset A* engine in strips_search.py).
+The action sequence is then expanded into a full week-by-week lifting
+programme exported to lifting_logs.csv.
 
 Usage:
-    pip install pddl
     python planning.py
 """
 
-import csv
+import time
 from datetime import date, timedelta
 from collections import deque
 
+from strips_search import BitsetTask, astar
+
 # Modify these values for a specific athlete before running.
 USER = {
     "name":                   "Athlete",
@@ -134,8 +137,15 @@ def _build_pddl_strings(user):
     return domain_str, problem_str, squat_ratio
 
 
-def build_pddl_model(user):
-    """Return (domain_str, problem_str, squat_ratio) using pddl package if available."""
+def build_pddl_model(user, use_package: bool = False):
+    """
+    Return (domain_str, problem_str, squat_ratio).
+
+    The strings are built natively by default; pass use_package=True to
+    build them with the pddl package instead (slower to import).
+    """
+    if not use_package:
+        return _build_pddl_strings(user)
     try:
         return _build_pddl_with_package(user)
     except ImportError:
@@ -144,6 +154,18 @@ def build_pddl_model(user):
         return _build_pddl_strings(user)
 
 
+# Squat-ratio thresholds at which an athlete may skip a block.
+SKIP_THRESHOLDS = [
+    (0.75, "base-built"),          # athlete can skip base block
+    (0.90, "hypertrophy-built"),   # athlete can skip hypertrophy block
+]
+
+
+def initial_atoms(squat_ratio: float) -> set:
+    """Ground atoms true at the start of the macrocycle for a given squat ratio."""
+    return {atom for threshold, atom in SKIP_THRESHOLDS if squat_ratio >= threshold}
+
+
 # minimal STRIPS forward-search planner.
 _STRIPS_ACTIONS = [
     {
@@ -170,7 +192,9 @@ _STRIPS_ACTIONS = [
 ]
 
 
-def bfs_planner(init_atoms: set, goal_atoms: set) -> list | None:
+def bfs_planner(init_atoms: set, goal_atoms: set,
+                actions: list | None = None,
+                stats: dict | None = None) -> list | None:
     """
     Forward BFS search over a ground STRIPS state space.
 
@@ -178,33 +202,82 @@ def bfs_planner(init_atoms: set, goal_atoms: set) -> list | None:
     ----------
     init_atoms : set of str   – ground atoms true in the initial state
     goal_atoms : set of str   – ground atoms that must be true in goal state
+    actions    : list, optional – STRIPS action dicts (default _STRIPS_ACTIONS)
+    stats      : dict, optional – filled with "expanded" and "time_s" counters
 
     Returns
     -------
     list of action-name strings (the plan), or None if unsolvable.
     """
+    actions    = _STRIPS_ACTIONS if actions is None else actions
+    t0         = time.perf_counter()
+    expanded   = 0
     init_state = frozenset(init_atoms)
     goal_state = frozenset(goal_atoms)
+    result     = None
 
     if goal_state <= init_state:
-        return []   # already at goal
+        result = []   # already at goal
+    else:
+        queue   = deque([(init_state, [])])
+        visited = {init_state}
+
+        while queue and result is None:
+            state, plan = queue.popleft()
+            expanded += 1
+            for action in actions:
+                if action["pre"] <= state and action["neg_pre"].isdisjoint(state):
+                    new_state = (state | action["add"]) - action["del"]
+                    new_plan  = plan + [action["name"]]
+                    if goal_state <= new_state:
+                        result = new_plan
+                        break
+                    if new_state not in visited:
+                        visited.add(new_state)
+                        queue.append((new_state, new_plan))
+
+    if stats is not None:
+        stats.update(expanded=expanded, time_s=time.perf_counter() - t0)
+    return result   # None if no plan exists
+
+
+# Compiled bitset tasks, keyed by the identity of the action list they came from.
+_TASK_CACHE: dict = {}
+
+
+def _bitset_task(actions: list, costs: tuple | None = None) -> BitsetTask:
+    key = (id(actions), costs)
+    if key not in _TASK_CACHE or _TASK_CACHE[key][0] is not actions:
+        _TASK_CACHE[key] = (actions, BitsetTask(actions, costs=costs))
+    return _TASK_CACHE[key][1]
+
+
+def astar_planner(init_atoms: set, goal_atoms: set,
+                  heuristic: str = "hff",
+                  actions: list | None = None,
+                  stats: dict | None = None) -> list | None:
+    """
+    A* search over the bitset-encoded STRIPS task (see strips_search.py).
 
-    queue   = deque([(init_state, [])])
-    visited = {init_state}
+    Drop-in alternative to `bfs_planner` for larger domains: states are
+    integer bitmasks, plans are rebuilt from parent pointers and actions are
+    indexed by precondition.
 
-    while queue:
-        state, plan = queue.popleft()
-        for action in _STRIPS_ACTIONS:
-            if action["pre"] <= state and action["neg_pre"].isdisjoint(state):
-                new_state = (state | action["add"]) - action["del"]
-                new_plan  = plan + [action["name"]]
-                if goal_state <= new_state:
-                    return new_plan
-                if new_state not in visited:
-                    visited.add(new_state)
-                    queue.append((new_state, new_plan))
+    Parameters
+    ----------
+    init_atoms : set of str   – ground atoms true in the initial state
+    goal_atoms : set of str   – ground atoms that must be true in goal state
+    heuristic  : str          – "blind", "hmax", "hadd" or "hff"
+    actions    : list, optional – STRIPS action dicts (default _STRIPS_ACTIONS)
+    stats      : dict, optional – filled with expanded/generated/evaluated/time_s
 
-    return None   # no plan exists
+    Returns
+    -------
+    list of action-name strings (the plan), or None if unsolvable.
+    """
+    actions = _STRIPS_ACTIONS if actions is None else actions
+    return astar(_bitset_task(actions), init_atoms, goal_atoms,
+                 heuristic=heuristic, stats=stats)
 
 
 
@@ -244,6 +317,53 @@ BLOCK_CONFIG: dict = {
     },
 }
 
+def optimal_planner(init_atoms: set, goal_atoms: set,
+                    weight: float = 1.0,
+                    heuristic: str = "hmax",
+                    max_weeks: float = float("inf"),
+                    actions: list | None = None,
+                    stats: dict | None = None,
+                    costs: dict | None = None) -> list | None:
+    """
+    Cost-optimal macrocycle search: minimise total weeks, not block count.
+
+    Each action costs BLOCK_CONFIG[action]["weeks"] (or costs[action]). With the default
+    weight 1.0 and the admissible h_max heuristic (or "blind" for plain
+    uniform-cost search) the first goal state popped is the shortest
+    calendar plan. weight > 1 runs weighted A* for large action sets and
+    returns a plan at most `weight` times the optimum.
+
+    Parameters
+    ----------
+    init_atoms : set of str   – ground atoms true in the initial state
+    goal_atoms : set of str   – ground atoms that must be true in goal state
+    weight     : float        – heuristic weight (1.0 = optimal)
+    heuristic  : str          – "blind", "hmax", "hadd" or "hff"
+    max_weeks  : float        – stop early: prune any partial plan that cannot
+                                finish within this many weeks
+    actions    : list, optional – STRIPS action dicts (default _STRIPS_ACTIONS)
+    stats      : dict, optional – search counters; "plan_cost" is total weeks
+    costs      : dict, optional – action name -> cost in weeks, for actions
+                                  (e.g. from another PDDL domain) that have
+                                  no BLOCK_CONFIG entry
+
+    Returns
+    -------
+    list of action-name strings (the plan), or None if unsolvable.
+    Raises ValueError if an action has no cost.
+    """
+    actions = _STRIPS_ACTIONS if actions is None else actions
+    if costs is None:
+        costs = {name: cfg["weeks"] for name, cfg in BLOCK_CONFIG.items()}
+    missing = [a["name"] for a in actions if a["name"] not in costs]
+    if missing:
+        raise ValueError(f"No week cost for action(s) {missing}; add them to "
+                         f"BLOCK_CONFIG or pass costs={{name: weeks}}")
+    weeks   = tuple(costs[a["name"]] for a in actions)
+    return astar(_bitset_task(actions, weeks), init_atoms, goal_atoms,
+                 heuristic=heuristic, weight=weight, bound=max_weeks, stats=stats)
+
+
 MAIN_LIFTS = ["Squat", "Bench Press", "Deadlift"]
 
 ACCESSORIES: dict = {
@@ -279,7 +399,8 @@ def _round_weight(weight_kg: float, increment: float = 2.5) -> float:
 
 # Loops over each block -> each week -> each session and builds a csv row per excerise
 
-def generate_logs(plan: list, user: dict) -> list:
+def iter_logs(plan: list, user: dict, first_week: int = 1, first_block_week: int = 1,
+              block_config: dict | None = None):
     """
     Expand an ordered list of PDDL action names into a full lifting log.
 
@@ -290,10 +411,16 @@ def generate_logs(plan: list, user: dict) -> list:
       * Estimated 1RM increases by weekly_gain each non-deload week.
       * Each session: one main compound lift + 3 accessories at 3x12 @ ~50% 1RM.
 
-    Returns a list of row dicts matching CSV_FIELDS.
+    Yields row dicts matching CSV_FIELDS one at a time, so callers can
+    stream arbitrarily long programmes without holding them in memory.
+
+    `first_week` numbers the first generated week and `first_block_week`
+    resumes the first block part-way through (used by replan_from_week).
+    `block_config` overrides BLOCK_CONFIG, e.g. with per-athlete block
+    lengths from block_search.py.
     """
-    rows   = []
-    week_n = 1
+    configs = BLOCK_CONFIG if block_config is None else block_config
+    week_n  = first_week
     one_rms = {
         "Squat":       user["current_squat_1rm"],
         "Bench Press": user["current_bench_1rm"],
@@ -304,10 +431,10 @@ def generate_logs(plan: list, user: dict) -> list:
     start      = user["start_date"]
     week_start = start + timedelta(days=(7 - start.weekday()) % 7)
 
-    for action in plan:
-        cfg = BLOCK_CONFIG[action]
+    for i, action in enumerate(plan):
+        cfg = configs[action]
 
-        for bw in range(1, cfg["weeks"] + 1):
+        for bw in range(first_block_week if i == 0 else 1, cfg["weeks"] + 1):
             deload = (bw % 4 == 0) and cfg["weeks"] >= 4
 
             # Intensity ramp (linear progression across the block)
@@ -328,7 +455,7 @@ def generate_logs(plan: list, user: dict) -> list:
                 main_wt      = _round_weight(one_rms[lift] * pct)
 
                 # Main compound lift
-                rows.append({
+                yield {
                     "Week":          week_n,
                     "Date":          session_date.isoformat(),
                     "Block":         cfg["label"],
@@ -344,11 +471,11 @@ def generate_logs(plan: list, user: dict) -> list:
                     "Intensity_Pct": round(pct * 100, 1),
                     "RPE_Target":    rpe,
                     "Est_1RM_kg":    round(one_rms[lift], 1),
-                })
+                }
 
                 # Accessory work at ~50% of main lift 1RM
                 for acc in ACCESSORIES[lift]:
-                    rows.append({
+                    yield {
                         "Week":          week_n,
                         "Date":          session_date.isoformat(),
                         "Block":         cfg["label"],
@@ -364,7 +491,7 @@ def generate_logs(plan: list, user: dict) -> list:
                         "Intensity_Pct": 50.0,
                         "RPE_Target":    7,
                         "Est_1RM_kg":    round(one_rms[lift], 1),
-                    })
+                    }
 
             # Progress estimated 1RMs after non-deload weeks
             if not deload:
@@ -374,7 +501,142 @@ def generate_logs(plan: list, user: dict) -> list:
             week_start += timedelta(weeks=1)
             week_n     += 1
 
-    return rows
+
+def generate_logs(plan: list, user: dict, block_config: dict | None = None) -> list:
+    """Expand a plan into a list of row dicts (materialised `iter_logs`)."""
+    return list(iter_logs(plan, user, block_config=block_config))
+
+
+def iter_log_batches(plan: list, user: dict, batch_size: int = 10_000):
+    """Yield `iter_logs` rows in lists of at most `batch_size`."""
+    batch = []
+    for row in iter_logs(plan, user):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _walk_blocks(blocks: list, actions: list, init_atoms=()) -> tuple:
+    """(atoms `blocks` need but neither `init_atoms` nor they produce, final state)."""
+    by_name = {a["name"]: a for a in actions}
+    needed, state = set(), set(init_atoms)
+    for name in blocks:
+        action  = by_name[name]
+        needed |= action["pre"] - state
+        state   = (state | action["pre"] | action["add"]) - action["del"]
+    return needed, state
+
+
+def _regress_state(blocks: list, actions: list, init_atoms=()) -> set:
+    """
+    State reached after `blocks`, starting from `init_atoms` plus the weakest
+    initial state in which the whole sequence is applicable (atoms the blocks
+    need but do not produce themselves, e.g. from blocks the athlete was
+    allowed to skip).
+    """
+    needed, state = _walk_blocks(blocks, actions, init_atoms)
+    return needed | state
+
+
+def _logged_blocks(rows: list, by_label: dict) -> tuple:
+    """Blocks started in `rows`, in order, and the block week after the last row."""
+    blocks, next_bw, prev_week = [], 1, None
+    for row in rows:
+        week = int(row["Week"])
+        if week != prev_week and int(row["Block_Week"]) == 1:
+            blocks.append(by_label[row["Block"]])
+        prev_week = week
+        next_bw   = int(row["Block_Week"]) + 1
+    return blocks, next_bw
+
+
+def replan_from_week(logs: list, current_week: int, new_maxes: dict,
+                     goal_atoms: set | None = None,
+                     planner=None, actions: list | None = None,
+                     init_atoms: set | None = None) -> list:
+    """
+    Re-plan the rest of a macrocycle after a mid-cycle retest.
+
+    Rows before `current_week` are returned untouched. If `current_week`
+    falls inside a block, that block is resumed at the same block week;
+    the blocks after it are re-derived by `planner` (default bfs_planner)
+    from the plan's initial atoms plus the state atoms the logged blocks
+    have established. Only the
+    future weeks are regenerated, with 1RM compounding restarted from the
+    retested maxes.
+
+    Parameters
+    ----------
+    logs         : list of dict – existing rows (generate_logs output, or
+                                  csv.DictReader rows of the exported CSV)
+    current_week : int          – first week to regenerate (1-based)
+    new_maxes    : dict         – retested 1RMs keyed like USER
+                                  ("current_squat_1rm", ...); lifts left out
+                                  keep their logged estimate for that week
+                                  (stored to 0.1 kg, so their later values
+                                  can drift from the original log by ~0.1 kg)
+    goal_atoms   : set, optional – default {"goal-reached"}
+    planner      : callable, optional – planner(init_atoms, goal_atoms, actions=...)
+    actions      : list, optional – STRIPS action dicts (default _STRIPS_ACTIONS)
+    init_atoms   : set, optional – atoms true at the start of the logged plan
+                                   (e.g. initial_atoms(squat_ratio)); by
+                                   default, the atoms the logged blocks need
+                                   but never produce, so skipped blocks stay
+                                   skipped
+
+    Returns
+    -------
+    list of row dicts: past rows followed by the regenerated future rows.
+    Raises ValueError if `logs` is empty or no valid plan completes the
+    macrocycle.
+    """
+    if not logs:
+        raise ValueError("No logged rows to re-plan from")
+    goal_atoms = {"goal-reached"} if goal_atoms is None else goal_atoms
+    planner    = bfs_planner if planner is None else planner
+    actions    = _STRIPS_ACTIONS if actions is None else actions
+    by_label   = {cfg["label"]: name for name, cfg in BLOCK_CONFIG.items()}
+
+    past = [r for r in logs if int(r["Week"]) < current_week]
+
+    # Blocks already started, in order, and how far into the last one we are.
+    blocks, resume_bw = _logged_blocks(past, by_label)
+    in_progress = blocks and resume_bw <= BLOCK_CONFIG[blocks[-1]]["weeks"]
+
+    if init_atoms is None:
+        # The whole logged plan needs these atoms without producing them:
+        # they held at its start (e.g. the skip atoms of initial_atoms).
+        init_atoms, _ = _walk_blocks(_logged_blocks(logs, by_label)[0], actions)
+    state = _regress_state(blocks, actions, init_atoms)
+    rest  = planner(state, goal_atoms, actions=actions)
+    if rest is None:
+        raise ValueError(f"No valid plan from week {current_week} with state {sorted(state)}")
+    plan = ([blocks[-1]] if in_progress else []) + rest
+
+    # 1RMs for the current week: retested values, else the logged estimate.
+    one_rms = {}
+    for lift, field in zip(MAIN_LIFTS, ("current_squat_1rm", "current_bench_1rm",
+                                        "current_deadlift_1rm")):
+        if field in new_maxes:
+            one_rms[field] = new_maxes[field]
+        else:
+            logged = [r for r in logs if r["Exercise"] == lift and r["Exercise_Type"] == "Main"
+                      and int(r["Week"]) <= current_week]
+            one_rms[field] = float(logged[-1]["Est_1RM_kg"])
+
+    # Monday of current_week, from any logged row.
+    ref    = logs[0]
+    monday = (date.fromisoformat(str(ref["Date"]))
+              - timedelta(days=_DAY_OFFSET[ref["Day"]])
+              + timedelta(weeks=current_week - int(ref["Week"])))
+
+    future = iter_logs(plan, dict(one_rms, start_date=monday),
+                       first_week=current_week,
+                       first_block_week=resume_bw if in_progress else 1)
+    return past + list(future)
 
 
 # Main function
@@ -400,34 +662,31 @@ def main():
     with open("gym_problem.pddl", "w") as f: f.write(problem_str)
     print("\nSaved -> gym_domain.pddl, gym_problem.pddl")
 
-    # 2. Determine initial state atoms from user profile
-    init_atoms: set = set()
-    if squat_ratio >= 0.75:
-        init_atoms.add("base-built")
-    if squat_ratio >= 0.90:
-        init_atoms.add("hypertrophy-built")
+    # 2. Compile the saved PDDL into grounded STRIPS tables (cached on disk)
+    from pddl_compiler import load_strips
+
+    task = load_strips("gym_domain.pddl", "gym_problem.pddl")
 
-    # 3. Solve with forward BFS
-    plan = bfs_planner(init_atoms, goal_atoms={"goal-reached"})
+    # 3. Solve for the shortest macrocycle in calendar weeks
+    plan = optimal_planner(task["init"], task["goal"], actions=task["actions"])
     if plan is None:
         print("\n[ERROR] No valid plan found. Check user profile and action definitions.")
         return
 
     total_weeks = sum(BLOCK_CONFIG[a]["weeks"] for a in plan)
-    print(f"\n[PLAN]  {len(plan)} block(s)  -  {total_weeks} weeks total")
+    print(f"\n[PLAN]  {len(plan)} block(s)  -  {total_weeks} weeks total (optimal)")
     for i, action in enumerate(plan, 1):
         cfg = BLOCK_CONFIG[action]
         print(f'  Step {i}: {cfg["label"]:16s}  ({cfg["weeks"]} wks)  {cfg["desc"]}')
 
-    # 4. Expand plan into lifting logs and export CSV
-    logs        = generate_logs(plan, USER)
+    # 4. Stream the expanded plan into the CSV in bounded batches
+    from log_sinks import CsvSink, write_batches
+
     output_file = "planning_lifting_logs.csv"
-    with open(output_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(logs)
+    with CsvSink(output_file) as sink:
+        n_rows = write_batches(iter_log_batches(plan, USER), sink)
 
-    print(f"\n[OUTPUT]  {len(logs):,} entries written -> {output_file}")
+    print(f"\n[OUTPUT]  {n_rows:,} entries written -> {output_file}")
     print(SEP)
 
 
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+policy_table.py  -  Universal Policy Table for the Gym Planner
+==============================================================
+The reachable state space of the gym-planner domain is tiny and identical
+for every athlete; only the initial state (derived from squat_ratio)
+differs. Instead of searching once per athlete, this module:
+
+  1. enumerates every state reachable from any athlete's initial state,
+  2. runs one backward (regression) Dijkstra sweep from the goal states
+     over the reversed transition graph, with BLOCK_CONFIG weeks as cost,
+  3. materialises a state -> next-action / plan-length table and
+     persists it as JSON, keyed by a hash of the actions, costs and goal.
+
+Planning for an athlete is then a single dict lookup.
+
+Usage:
+    python policy_table.py          # build (or load) gym_policy.json
+"""
+
+import hashlib
+import heapq
+import json
+import os
+from itertools import count
+
+import planning
+from strips_search import BitsetTask
+
+POLICY_FILE = "gym_policy.json"
+
+
+def _state_key(atoms) -> str:
+    """Canonical, JSON-friendly key for a set of ground atoms."""
+    return " ".join(sorted(atoms))
+
+
+def _table_hash(actions: list, goal_atoms: set) -> str:
+    payload = {
+        "actions": [
+            {
+                "name":    a["name"],
+                "pre":     sorted(a["pre"]),
+                "neg_pre": sorted(a["neg_pre"]),
+                "add":     sorted(a["add"]),
+                "del":     sorted(a["del"]),
+                "weeks":   planning.BLOCK_CONFIG[a["name"]]["weeks"],
+            }
+            for a in actions
+        ],
+        "goal": sorted(goal_atoms),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _seed_states() -> list:
+    """Every distinct initial state an athlete profile can produce."""
+    ratios = [0.0] + [threshold for threshold, _ in planning.SKIP_THRESHOLDS]
+    return [planning.initial_atoms(r) for r in ratios]
+
+
+def build_policy_table(actions: list | None = None,
+                       goal_atoms: set | None = None,
+                       seeds: list | None = None) -> dict:
+    """
+    Compute the optimal next action for every reachable state.
+
+    Parameters
+    ----------
+    actions    : list, optional – STRIPS action dicts (default planning._STRIPS_ACTIONS)
+    goal_atoms : set, optional  – goal atoms (default {"goal-reached"})
+    seeds      : list, optional – initial atom sets to explore from
+                                  (default: every squat_ratio profile)
+
+    Returns
+    -------
+    dict with "hash", "goal" and "states"; "states" maps a state key to
+    {"next": action name or None, "steps": int, "weeks": int, "plan": [...]}.
+    States from which the goal is unreachable are omitted.
+    """
+    actions    = planning._STRIPS_ACTIONS if actions is None else actions
+    goal_atoms = {"goal-reached"} if goal_atoms is None else set(goal_atoms)
+    seeds      = _seed_states() if seeds is None else seeds
+
+    weeks = [planning.BLOCK_CONFIG[a["name"]]["weeks"] for a in actions]
+    task  = BitsetTask(actions, atoms=set().union(*seeds) | goal_atoms, costs=weeks)
+    goal  = task.encode(goal_atoms)
+
+    # Forward sweep: reachable states and the reversed transition graph.
+    frontier = [task.encode(s) for s in seeds]
+    reached  = set(frontier)
+    incoming: dict = {s: [] for s in reached}
+    while frontier:
+        state = frontier.pop()
+        for ai, nxt in task.successors(state):
+            if nxt not in reached:
+                reached.add(nxt)
+                incoming[nxt] = []
+                frontier.append(nxt)
+            incoming[nxt].append((state, ai))
+
+    # Backward sweep: Dijkstra from every goal state over reversed edges.
+    tie   = count()
+    dist  = {s: 0 for s in reached if s & goal == goal}
+    nxt_a = {s: None for s in dist}
+    succ  = {s: None for s in dist}
+    heap  = [(0, next(tie), s) for s in dist]
+    done  = set()
+    while heap:
+        d, _, state = heapq.heappop(heap)
+        if state in done:
+            continue
+        done.add(state)
+        for prev, ai in incoming[state]:
+            nd = d + task.costs[ai]
+            if nd < dist.get(prev, float("inf")):
+                dist[prev]  = nd
+                nxt_a[prev] = ai
+                succ[prev]  = state
+                heapq.heappush(heap, (nd, next(tie), prev))
+
+    states = {}
+    for state in sorted(done, key=lambda s: dist[s]):
+        plan, cur = [], state
+        while nxt_a[cur] is not None:
+            plan.append(task.names[nxt_a[cur]])
+            cur = succ[cur]
+        states[_state_key(task.decode(state))] = {
+            "next":  plan[0] if plan else None,
+            "steps": len(plan),
+            "weeks": dist[state],
+            "plan":  plan,
+        }
+
+    return {
+        "hash":   _table_hash(actions, goal_atoms),
+        "goal":   sorted(goal_atoms),
+        "atoms":  task.atoms,
+        "states": states,
+    }
+
+
+def save_policy_table(table: dict, path: str = POLICY_FILE) -> None:
+    with open(path, "w") as f:
+        json.dump(table, f, indent=2)
+
+
+def load_policy_table(path: str = POLICY_FILE,
+                      actions: list | None = None,
+                      goal_atoms: set | None = None) -> dict:
+    """
+    Load a persisted table, rebuilding and re-saving it if it is missing or
+    was built from different actions, block lengths or goal.
+    """
+    actions    = planning._STRIPS_ACTIONS if actions is None else actions
+    goal_atoms = {"goal-reached"} if goal_atoms is None else set(goal_atoms)
+    expected   = _table_hash(actions, goal_atoms)
+
+    if os.path.exists(path):
+        with open(path) as f:
+            table = json.load(f)
+        if table.get("hash") == expected:
+            return table
+
+    table = build_policy_table(actions, goal_atoms)
+    save_policy_table(table, path)
+    return table
+
+
+def lookup_plan(table: dict, init_atoms) -> list | None:
+    """O(1) plan lookup; returns None if the state is unknown or unsolvable."""
+    init_atoms = set(init_atoms)
+    if set(table["goal"]) <= init_atoms:
+        return []
+    known = set(table["atoms"])
+    entry = table["states"].get(_state_key(a for a in init_atoms if a in known))
+    return None if entry is None else list(entry["plan"])
+
+
+def plan_for_user(table: dict, user: dict) -> list | None:
+    """Plan for one athlete profile (same keys as planning.USER)."""
+    squat_ratio = user["current_squat_1rm"] / user["target_squat_1rm"]
+    return lookup_plan(table, planning.initial_atoms(squat_ratio))
+
+
+def main():
+    SEP = "=" * 64
+    table = load_policy_table()
+    print(SEP)
+    print(f"  POLICY TABLE  -  {len(table['states'])} state(s)  ->  {POLICY_FILE}")
+    print(SEP)
+    for key, entry in table["states"].items():
+        label = "{" + (key or "") + "}"
+        print(f'  {label:40s}  next={str(entry["next"]):22s}'
+              f'  steps={entry["steps"]}  weeks={entry["weeks"]}')
+    print(SEP)
+
+
+if __name__ == "__main__":
+    main()
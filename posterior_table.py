@@ -0,0 +1,191 @@
+"""
+Virtual Lifter: Precompiled Posterior Table
+-------------------------------------------
+The Streamlit app only ever conditions on the three root nodes
+(Sleep x Macros x TimeRest = 27 evidence combinations), so every answer it
+can give is computed once here and stored as a dense NumPy tensor:
+
+    probs[sleep, macros, time_rest, q, s]  = P(query_vars[q] = s | roots)
+    argmax[sleep, macros, time_rest, q]    = most likely state of query_vars[q]
+
+    workout_map[sleep, macros, time_rest, j] = state of workout_vars[j] in the
+                                               most probable joint workout
+    workout_prob[sleep, macros, time_rest]   = its joint probability
+
+The table is saved to an .npz file together with the hash of the model it
+was compiled from (see bn_arrays.network_hash). Looking up a posterior is a
+single array index and needs neither pgmpy nor the model at request time.
+
+Run this script to (re)compile the table:
+    python posterior_table.py
+"""
+
+import json
+import os
+
+import numpy as np
+
+TABLE_FILE = "posterior_table.npz"
+TABLE_VERSION = 2
+
+
+def compile_table(model=None) -> dict:
+    """Compute every non-root posterior for every root-evidence combination.
+
+    Args:
+        model: A validated DiscreteBayesianNetwork; the saved network from
+            bn_arrays.load_network is used if omitted.
+
+    Returns:
+        dict: roots, root_states, query_vars, query_states, hash,
+        probs (float64, zero-padded to the largest query cardinality)
+        and argmax (uint8).
+    """
+    from itertools import product
+
+    import bn_arrays
+    from junction_tree import JunctionTree
+    from map_inference import WORKOUT_VARS, MapEngine
+
+    net   = bn_arrays.load_network() if model is None else bn_arrays.from_model(model)
+    roots = [n for n in net["nodes"] if not net["parents"][n]]
+    query = [n for n in net["nodes"] if net["parents"][n]]
+
+    root_cards = [net["cards"][r] for r in roots]
+    max_card   = max(net["cards"][q] for q in query)
+    probs      = np.zeros(root_cards + [len(query), max_card])
+
+    workout      = list(WORKOUT_VARS)
+    workout_map  = np.zeros(root_cards + [len(workout)], dtype=np.uint8)
+    workout_prob = np.zeros(root_cards)
+
+    # One junction-tree propagation per combination yields every posterior;
+    # one max-product pass gives the joint workout recommendation.
+    engine  = JunctionTree(net, cache_size=0)
+    mapping = MapEngine(net, cache_size=0)
+    for codes in product(*(range(c) for c in root_cards)):
+        evidence  = dict(zip(roots, codes))
+        marginals = engine.query_all(evidence)
+        for qi, var in enumerate(query):
+            probs[codes + (qi, slice(0, net["cards"][var]))] = marginals[var]
+        best = mapping.map(evidence, workout)
+        workout_map[codes]  = [net["states"][v].index(best["assignment"][v]) for v in workout]
+        workout_prob[codes] = best["probability"]
+
+    return {
+        "hash":         bn_arrays.network_hash(net),
+        "roots":        roots,
+        "root_states":  [net["states"][r] for r in roots],
+        "query_vars":   query,
+        "query_states": [net["states"][q] for q in query],
+        "probs":        probs,
+        "argmax":       probs.argmax(axis=-1).astype(np.uint8),
+        "version":      TABLE_VERSION,
+        "workout_vars": workout,
+        "workout_map":  workout_map,
+        "workout_prob": workout_prob,
+    }
+
+
+def save_table(table: dict, path: str = TABLE_FILE) -> None:
+    meta = {k: table[k] for k in ("version", "hash", "roots", "root_states",
+                                  "query_vars", "query_states", "workout_vars")}
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, probs=table["probs"], argmax=table["argmax"],
+             workout_map=table["workout_map"], workout_prob=table["workout_prob"],
+             meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)
+
+
+def load_table(path: str = TABLE_FILE) -> dict:
+    """Load a compiled table (NumPy only, no pgmpy)."""
+    with np.load(path, allow_pickle=False) as data:
+        table = json.loads(str(data["meta"]))
+        if table.get("version") != TABLE_VERSION:
+            raise ValueError(f"'{path}' is an outdated posterior table")
+        for name in ("probs", "argmax", "workout_map", "workout_prob"):
+            table[name] = data[name]
+    table["_root_index"] = [{s: i for i, s in enumerate(states)}
+                            for states in table["root_states"]]
+    return table
+
+
+def load_or_compile(path: str = TABLE_FILE) -> dict:
+    """Load the table, compiling and saving it first if missing or outdated.
+
+    Outdated means an older table format or a table compiled from a
+    different model than the current bn_arrays.load_network().
+    """
+    import bn_arrays
+
+    current = bn_arrays.network_hash(bn_arrays.load_network())
+    if os.path.exists(path):
+        try:
+            table = load_table(path)
+        except (OSError, ValueError, KeyError):
+            table = None
+        if table is not None and table["hash"] == current:
+            return table
+    save_table(compile_table(), path)
+    return load_table(path)
+
+
+def lookup(table: dict, evidence: dict) -> dict:
+    """Posterior summary for one root-evidence combination.
+
+    Args:
+        table: A table from load_table.
+        evidence: {root name: state name} for every root node.
+
+    Returns:
+        dict: {var: {'best_state', 'best_prob', 'all_states', 'all_probs'}},
+        the same structure app.py renders.
+    """
+    index = tuple(table["_root_index"][i][evidence[r]] for i, r in enumerate(table["roots"]))
+    probs, best = table["probs"][index], table["argmax"][index]
+    results = {}
+    for qi, var in enumerate(table["query_vars"]):
+        states = table["query_states"][qi]
+        row    = probs[qi, :len(states)]
+        results[var] = {
+            'best_state': states[best[qi]],
+            'best_prob': float(row[best[qi]]),
+            'all_states': list(states),
+            'all_probs': row.tolist(),
+        }
+    return results
+
+
+def lookup_workout(table: dict, evidence: dict) -> dict:
+    """Most probable joint workout for one root-evidence combination.
+
+    Returns:
+        dict: "assignment" ({workout var: state name}) and "probability".
+    """
+    index  = tuple(table["_root_index"][i][evidence[r]] for i, r in enumerate(table["roots"]))
+    states = [table["query_states"][table["query_vars"].index(v)] for v in table["workout_vars"]]
+    codes  = table["workout_map"][index]
+    return {
+        "assignment":  {v: s[c] for v, s, c in zip(table["workout_vars"], states, codes)},
+        "probability": float(table["workout_prob"][index]),
+    }
+
+
+# ── Run when executed directly ──
+if __name__ == "__main__":
+    import bn_arrays
+
+    current = bn_arrays.network_hash(bn_arrays.load_network())
+    try:
+        up_to_date = load_table(TABLE_FILE)["hash"] == current
+    except (OSError, ValueError, KeyError):
+        up_to_date = False
+    if up_to_date:
+        print(f"'{TABLE_FILE}' is up to date (model {current[:12]}).")
+    else:
+        print("Compiling posteriors for every root-evidence combination...")
+        table = compile_table()
+        save_table(table, TABLE_FILE)
+        n_combos = int(np.prod(table["probs"].shape[:len(table["roots"])]))
+        print(f"Saved {n_combos} combinations x {len(table['query_vars'])} variables "
+              f"to '{TABLE_FILE}' (model {table['hash'][:12]}).")
@@ -10,86 +10,80 @@ Dependencies to install before running:
     pip install pgmpy pandas numpy
 """
 
-import pandas as pd
-import numpy as np
-from pgmpy.models import DiscreteBayesianNetwork
-from pgmpy.factors.discrete import TabularCPD
-from pgmpy.sampling import BayesianModelSampling
+from cpt_builder import score_cpt
 
 
 def _generate_recovery_cpt():
-    """Dynamically generate the Recovery CPT based on a simple scoring logic.
+    """Generate the Recovery CPT from a simple scoring rule.
     
-    Because Recovery has 3 parents with 3 states each, it requires
-    3 * 3 * 3 = 27 columns.
+    Recovery has 3 parents with 3 states each (27 columns). Each parent
+    contributes its state index to a score (max 6, min 0), and the score
+    band picks the distribution.
     """
-    cpt_values = np.zeros((3, 27))
-    col = 0
-    for sleep in [0, 1, 2]:      # 0: <6, 1: 6-8, 2: >8
-        for macros in [0, 1, 2]: # 0: Deficit, 1: Maint, 2: Surplus
-            for rest in [0, 1, 2]:   # 0: 0 Days, 1: 1-2 Days, 2: 3+ Days
-                score = sleep + macros + rest # Max score = 6, Min = 0
-                
-                if score <= 2:
-                    probs = [0.8, 0.15, 0.05] # Highly likely to be Poor
-                elif score <= 4:
-                    probs = [0.2, 0.6, 0.2]   # Highly likely to be Adequate
-                else:
-                    probs = [0.05, 0.15, 0.8] # Highly likely to be Optimal
-                
-                cpt_values[:, col] = probs
-                col += 1
-    return cpt_values.tolist()
+    return score_cpt(
+        parent_cards=[3, 3, 3],  # Sleep (<6, 6-8, >8), Macros (Deficit, Maint, Surplus),
+                                 # TimeRest (0 Days, 1-2 Days, 3+ Days)
+        weights=[1, 1, 1],       # score = sleep + macros + rest
+        bands=[
+            (2,    [0.8, 0.15, 0.05]),  # Highly likely to be Poor
+            (4,    [0.2, 0.6, 0.2]),    # Highly likely to be Adequate
+            (None, [0.05, 0.15, 0.8]),  # Highly likely to be Optimal
+        ],
+    ).tolist()
 
 
-def build_model():
-    """Construct and validate the Virtual Lifter Bayesian Network.
+EDGES = [
+    # Layer 1 to Layer 2
+    ('Sleep', 'Recovery'),
+    ('Macros', 'Recovery'),
+    ('TimeRest', 'Recovery'),
+    ('TimeRest', 'Fatigue'),
+
+    # Layer 2 Internal Dependencies
+    ('Recovery', 'Readiness'),
+    ('Fatigue', 'Readiness'),
+    ('Fatigue', 'Risk'),
+    ('Recovery', 'Soreness'),
+
+    # Layer 2 to Layer 3 (The Log Outputs)
+    ('Readiness', 'Weight'),
+    ('Readiness', 'Volume'),
+    ('Risk', 'Volume'),
+    ('Weight', 'RPE'),
+    ('Volume', 'RPE')
+]
+
+
+def cpd_specs():
+    """The CPDs of the network as TabularCPD keyword arguments.
+    
+    Kept as plain data so bn_arrays can build the network without pgmpy.
     
     Returns:
-        DiscreteBayesianNetwork: The validated model with all CPDs attached.
+        list: One dict per node (variable, variable_card, values and
+        optionally evidence, evidence_card), each with state_names.
     """
-    model = DiscreteBayesianNetwork([
-        # Layer 1 to Layer 2
-        ('Sleep', 'Recovery'),
-        ('Macros', 'Recovery'),
-        ('TimeRest', 'Recovery'),
-        ('TimeRest', 'Fatigue'),
-        
-        # Layer 2 Internal Dependencies
-        ('Recovery', 'Readiness'),
-        ('Fatigue', 'Readiness'),
-        ('Fatigue', 'Risk'),
-        ('Recovery', 'Soreness'),
-        
-        # Layer 2 to Layer 3 (The Log Outputs)
-        ('Readiness', 'Weight'),
-        ('Readiness', 'Volume'),
-        ('Risk', 'Volume'),
-        ('Weight', 'RPE'),
-        ('Volume', 'RPE')
-    ])
-
     # We use state_names so our final generated CSV contains readable text (e.g., "Surplus") 
     # instead of integer codes (e.g., 2).
 
-    cpd_sleep = TabularCPD(variable='Sleep', variable_card=3,
-                           values=[[0.3], [0.5], [0.2]], # <6, 6-8, >8
-                           state_names={'Sleep': ['<6 hours', '6-8 hours', '>8 hours']})
+    cpd_sleep = dict(variable='Sleep', variable_card=3,
+                     values=[[0.3], [0.5], [0.2]], # <6, 6-8, >8
+                     state_names={'Sleep': ['<6 hours', '6-8 hours', '>8 hours']})
 
-    cpd_macros = TabularCPD(variable='Macros', variable_card=3,
-                            values=[[0.3], [0.4], [0.3]], # Deficit, Maint, Surplus
-                            state_names={'Macros': ['Deficit', 'Maintenance', 'Surplus']})
+    cpd_macros = dict(variable='Macros', variable_card=3,
+                      values=[[0.3], [0.4], [0.3]], # Deficit, Maint, Surplus
+                      state_names={'Macros': ['Deficit', 'Maintenance', 'Surplus']})
 
-    cpd_timerest = TabularCPD(variable='TimeRest', variable_card=3,
-                              values=[[0.2], [0.5], [0.3]], # 0 Days, 1-2 Days, 3+ Days
-                              state_names={'TimeRest': ['0 Days', '1-2 Days', '3+ Days']})
+    cpd_timerest = dict(variable='TimeRest', variable_card=3,
+                        values=[[0.2], [0.5], [0.3]], # 0 Days, 1-2 Days, 3+ Days
+                        state_names={'TimeRest': ['0 Days', '1-2 Days', '3+ Days']})
 
 
     # --- LAYER 2: HIDDEN NODES ---
 
     # Fatigue (Depends on TimeRest)
     # Columns represent TimeRest: [0 Days, 1-2 Days, 3+ Days]
-    cpd_fatigue = TabularCPD(
+    cpd_fatigue = dict(
         variable='Fatigue', variable_card=3,
         evidence=['TimeRest'], evidence_card=[3],
         values=[
@@ -103,7 +97,7 @@ def build_model():
 
     # Injury Risk (Depends on Fatigue)
     # Columns represent Fatigue: [Low, Moderate, High]
-    cpd_risk = TabularCPD(
+    cpd_risk = dict(
         variable='Risk', variable_card=3,
         evidence=['Fatigue'], evidence_card=[3],
         values=[
@@ -116,7 +110,7 @@ def build_model():
     )
 
     # Recovery (Depends on Sleep, Macros, TimeRest)
-    cpd_recovery = TabularCPD(
+    cpd_recovery = dict(
         variable='Recovery', variable_card=3,
         evidence=['Sleep', 'Macros', 'TimeRest'], evidence_card=[3, 3, 3],
         values=_generate_recovery_cpt(),
@@ -128,7 +122,7 @@ def build_model():
 
     # Readiness (Depends on Recovery, Fatigue)
     # 9 columns. Parents: Recovery (Poor, Adq, Opt), Fatigue (Low, Mod, High)
-    cpd_readiness = TabularCPD(
+    cpd_readiness = dict(
         variable='Readiness', variable_card=3,
         evidence=['Recovery', 'Fatigue'], evidence_card=[3, 3],
         # Col Order: (Poor,Low), (Poor,Mod), (Poor,High), (Adq,Low), (Adq,Mod), (Adq,High), (Opt,Low), (Opt,Mod), (Opt,High)
@@ -145,7 +139,7 @@ def build_model():
     # --- LAYER 3: LEAF NODES (Outputs) ---
 
     # Soreness (Depends on Recovery)
-    cpd_soreness = TabularCPD(
+    cpd_soreness = dict(
         variable='Soreness', variable_card=3,
         evidence=['Recovery'], evidence_card=[3],
         values=[
@@ -158,7 +152,7 @@ def build_model():
     )
 
     # Weight Lifted (Depends on Readiness)
-    cpd_weight = TabularCPD(
+    cpd_weight = dict(
         variable='Weight', variable_card=3,
         evidence=['Readiness'], evidence_card=[3],
         values=[
@@ -172,7 +166,7 @@ def build_model():
 
     # Volume (Depends on Readiness, Risk)
     # 9 columns. Parents: Readiness (Low, Med, High), Risk (Low, Elev, Crit)
-    cpd_volume = TabularCPD(
+    cpd_volume = dict(
         variable='Volume', variable_card=3,
         evidence=['Readiness', 'Risk'], evidence_card=[3, 3],
         values=[
@@ -187,7 +181,7 @@ def build_model():
 
     # RPE (Depends on Weight, Volume)
     # 9 columns. Parents: Weight (Light, Work, Heavy), Volume (Low, Targ, High)
-    cpd_rpe = TabularCPD(
+    cpd_rpe = dict(
         variable='RPE', variable_card=3,
         evidence=['Weight', 'Volume'], evidence_card=[3, 3],
         values=[
@@ -200,35 +194,46 @@ def build_model():
                      'Volume': ['Low', 'Target', 'High']}
     )
 
-    model.add_cpds(cpd_sleep, cpd_macros, cpd_timerest, 
-                   cpd_fatigue, cpd_risk, cpd_recovery, 
-                   cpd_readiness, cpd_soreness, cpd_weight, 
-                   cpd_volume, cpd_rpe)
+    return [cpd_sleep, cpd_macros, cpd_timerest,
+            cpd_fatigue, cpd_risk, cpd_recovery,
+            cpd_readiness, cpd_soreness, cpd_weight,
+            cpd_volume, cpd_rpe]
+
+
+def build_model():
+    """Construct and validate the Virtual Lifter Bayesian Network.
+    
+    Returns:
+        DiscreteBayesianNetwork: The validated model with all CPDs attached.
+    """
+    from pgmpy.models import DiscreteBayesianNetwork
+    from pgmpy.factors.discrete import TabularCPD
+
+    model = DiscreteBayesianNetwork(EDGES)
+    model.add_cpds(*(TabularCPD(**spec) for spec in cpd_specs()))
 
     assert model.check_model() == True
     return model
 
 
-def generate_samples(model, num_samples=10000):
+def generate_samples(model, num_samples=10000, seed=None):
     """Generate synthetic lifting logs via ancestral (forward) sampling.
     
+    Sampling is vectorised over the whole batch by bn_sampler; use
+    bn_sampler.write_csv directly to stream tens of millions of rows.
+    
     Args:
         model: A validated DiscreteBayesianNetwork.
         num_samples: Number of synthetic rows to generate.
+        seed: Optional seed for reproducible samples.
     
     Returns:
         pd.DataFrame: Synthetic dataset ordered from causes to effects.
     """
-    simulator = BayesianModelSampling(model)
-    synthetic_data = simulator.forward_sample(size=num_samples, show_progress=True)
-
-    # Reorder columns so they read logically from cause to effect
-    column_order = [
-        'Sleep', 'Macros', 'TimeRest',          # Roots
-        'Recovery', 'Fatigue', 'Readiness', 'Risk', # Hidden
-        'Soreness', 'Weight', 'Volume', 'RPE'   # Outputs
-    ]
-    return synthetic_data[column_order]
+    import bn_arrays
+    import bn_sampler
+
+    return bn_sampler.sample_frame(bn_arrays.from_model(model), num_samples, seed=seed)
 
 
 # ── Run when executed directly (preserves original behavior) ──
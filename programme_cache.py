@@ -0,0 +1,195 @@
+"""
+programme_cache.py  -  Content-Addressed Cache for Expanded Programmes
+=======================================================================
+Most nightly regenerations expand the same plan for the same 1RMs again.
+`ProgrammeCache` keys every expanded programme on a SHA-256 of everything
+that determines its rows:
+
+    plan, the current_*_1rm fields of the profile, the week-anchored start
+    date (first Monday on/after start_date), BLOCK_CONFIG, ACCESSORIES and
+    WEEKLY_SCHEDULE
+
+and stores the structured array produced by log_columnar.py in two tiers:
+
+    memory  - an LRU of at most `max_entries` programmes
+    disk    - one .npy file per key, evicted oldest-access-first once the
+              directory grows past `max_disk_bytes`
+
+Below that, the athlete-independent part of a programme (the week
+template from `log_columnar.build_template`) is cached per plan, so
+athletes that differ only in their 1RMs or start dates skip rebuilding it.
+
+Hit and miss counters for every tier are kept in `cache.stats`.
+
+Example:
+    cache = ProgrammeCache()
+    arr   = cache.get(plan, user)
+    print(cache.stats)
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+
+import planning
+from log_columnar import ONE_RM_FIELDS, build_template, expand_template
+
+CACHE_DIR = ".programme_cache"
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _config_payload() -> dict:
+    return {
+        "blocks":      planning.BLOCK_CONFIG,
+        "accessories": planning.ACCESSORIES,
+        "schedule":    planning.WEEKLY_SCHEDULE,
+    }
+
+
+def template_key(plan: list) -> str:
+    """Hash of the athlete-independent inputs of a programme."""
+    return _digest({"plan": list(plan), **_config_payload()})
+
+
+def programme_key(plan: list, user: dict) -> str:
+    """Content hash of everything that determines generate_logs(plan, user)."""
+    start  = user["start_date"]
+    monday = start + timedelta(days=(7 - start.weekday()) % 7)
+    return _digest({
+        "plan":  list(plan),
+        # repr keeps 100 and 100.0 apart; they are written differently.
+        "1rm":   {field: repr(user[field]) for field in ONE_RM_FIELDS.values()},
+        "start": monday.isoformat(),
+        **_config_payload(),
+    })
+
+
+class ProgrammeCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of expanded programmes."""
+
+    def __init__(self, max_entries: int = 1024,
+                 disk_dir: str | None = CACHE_DIR,
+                 max_disk_bytes: int = 256 * 1024 ** 2,
+                 max_templates: int = 64):
+        self.max_entries    = max_entries
+        self.disk_dir       = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_templates  = max_templates
+        self._memory        = OrderedDict()
+        self._templates     = OrderedDict()
+        self._disk_bytes    = 0
+        self.stats = {
+            "memory_hits":      0,
+            "disk_hits":        0,
+            "misses":           0,
+            "template_hits":    0,
+            "template_misses":  0,
+            "memory_evictions": 0,
+            "disk_evictions":   0,
+        }
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(e.stat().st_size for e in self._disk_entries())
+
+    # ── Public API ──────────────────────────────────────────────────────
+
+    def get(self, plan: list, user: dict) -> np.ndarray:
+        """
+        Expanded programme for one athlete (read-only structured array, as
+        returned by log_columnar.generate_log_columns for [user]).
+        """
+        key = programme_key(plan, user)
+
+        arr = self._memory.get(key)
+        if arr is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return arr
+
+        arr = self._disk_get(key)
+        if arr is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            arr = expand_template(self._template(plan), [user])
+            self._disk_put(key, arr)
+
+        arr.setflags(write=False)
+        self._memory_put(key, arr)
+        return arr
+
+    def clear(self, disk: bool = False) -> None:
+        self._memory.clear()
+        self._templates.clear()
+        if disk and self.disk_dir:
+            for entry in self._disk_entries():
+                os.remove(entry.path)
+            self._disk_bytes = 0
+
+    # ── Tiers ───────────────────────────────────────────────────────────
+
+    def _template(self, plan: list) -> dict:
+        key = template_key(plan)
+        template = self._templates.get(key)
+        if template is not None:
+            self._templates.move_to_end(key)
+            self.stats["template_hits"] += 1
+            return template
+        self.stats["template_misses"] += 1
+        template = build_template(plan)
+        self._templates[key] = template
+        if len(self._templates) > self.max_templates:
+            self._templates.popitem(last=False)
+        return template
+
+    def _memory_put(self, key: str, arr: np.ndarray) -> None:
+        self._memory[key] = arr
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def _disk_entries(self):
+        return [e for e in os.scandir(self.disk_dir) if e.name.endswith(".npy")]
+
+    def _disk_get(self, key: str):
+        if not self.disk_dir:
+            return None
+        path = os.path.join(self.disk_dir, f"{key}.npy")
+        try:
+            arr = np.load(path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)      # mark as recently used for eviction
+        except OSError:
+            pass                # evicted meanwhile; the loaded copy is still valid
+        return arr
+
+    def _disk_put(self, key: str, arr: np.ndarray) -> None:
+        if not self.disk_dir:
+            return
+        path     = os.path.join(self.disk_dir, f"{key}.npy")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(tmp_path, path)
+        self._disk_bytes += os.path.getsize(path)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = sorted(self._disk_entries(), key=lambda e: e.stat().st_mtime)
+        self._disk_bytes = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            self._disk_bytes -= entry.stat().st_size
+            os.remove(entry.path)
+            self.stats["disk_evictions"] += 1
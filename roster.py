@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+roster.py  -  Multi-Athlete Roster Planner
+===========================================
+Plans and expands a whole roster of athletes in parallel.
+
+The roster is a CSV or JSON file of athlete profiles with the same keys as
+`planning.USER` (missing keys fall back to USER) plus an optional
+`athlete_id`. Athletes are split, in file order, into fixed-size shards;
+each shard is planned and expanded in a worker process of a
+`ProcessPoolExecutor` and written to its own CSV with a leading athlete_id
+column. Shard contents and file names depend only on the roster and the
+shard size, never on worker scheduling, so reruns are reproducible.
+
+Within a shard, athletes that share a plan are expanded together by the
+vectorised generator in log_columnar.py.
+
+Usage:
+    python roster.py roster.csv [--out-dir roster_logs] [--shard-size 500] [--workers N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+
+import planning
+from log_columnar import generate_log_columns, write_columns_csv
+
+SHARD_NAME = "lifting_logs-{:05d}.csv"
+
+
+def _coerce(key: str, value):
+    """
+    Turn a roster CSV/JSON field into the type USER uses for that key.
+
+    Only USER keys are converted (dates from ISO strings, numbers from
+    numeric strings); any other column, e.g. athlete_id or notes, passes
+    through unchanged.
+    """
+    default = planning.USER.get(key)
+    if isinstance(default, date):
+        return value if isinstance(value, date) else date.fromisoformat(str(value))
+    if isinstance(default, bool) or not isinstance(default, (int, float)) \
+            or not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def load_roster(path: str) -> list:
+    """
+    Read athlete profiles from a .csv or .json file.
+
+    Returns
+    -------
+    list of dicts, each a complete USER-style profile with an "athlete_id"
+    (taken from the file, or the 0-based row number).
+    """
+    with open(path, newline="") as f:
+        if path.endswith(".json"):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+
+    roster = []
+    for i, rec in enumerate(records):
+        profile = dict(planning.USER)
+        for k, v in rec.items():
+            if v in ("", None):
+                continue
+            try:
+                profile[k] = _coerce(k, v)
+            except ValueError:
+                raise ValueError(f"{path}: athlete {i}: {k}={v!r} is not a valid "
+                                 f"{type(planning.USER[k]).__name__}") from None
+        profile.setdefault("athlete_id", i)
+        roster.append(profile)
+    return roster
+
+
+def plan_athlete(user: dict) -> list | None:
+    """Shortest-in-weeks plan for one athlete profile."""
+    squat_ratio = user["current_squat_1rm"] / user["target_squat_1rm"]
+    return planning.optimal_planner(planning.initial_atoms(squat_ratio), {"goal-reached"})
+
+
+def expand_shard(users: list) -> tuple:
+    """
+    Plan and expand a list of athletes.
+
+    Returns
+    -------
+    (structured log array ordered by athlete then row, list of athlete_ids
+    indexed by the array's "Athlete" field, list of unsolvable athlete_ids)
+    """
+    groups: dict = {}
+    unsolved = []
+    for idx, user in enumerate(users):
+        plan = plan_athlete(user)
+        if plan is None:
+            unsolved.append(user["athlete_id"])
+        else:
+            groups.setdefault(tuple(plan), []).append(idx)
+
+    parts = []
+    for plan, members in groups.items():
+        part = generate_log_columns(list(plan), [users[i] for i in members])
+        part["Athlete"] = np.asarray(members, dtype=np.int32)[part["Athlete"]]
+        parts.append(part)
+
+    if parts:
+        arr = np.concatenate(parts)
+        arr = arr[np.argsort(arr["Athlete"], kind="stable")]
+    else:
+        arr = generate_log_columns([], [])
+    return arr, [u["athlete_id"] for u in users], unsolved
+
+
+def _run_shard(shard: int, users: list, out_dir: str) -> dict:
+    arr, ids, unsolved = expand_shard(users)
+    path = os.path.join(out_dir, SHARD_NAME.format(shard))
+    with open(path, "w", newline="") as f:
+        write_columns_csv(arr, f, athlete_ids=ids)
+    return {"shard": shard, "path": path, "athletes": len(users),
+            "rows": int(arr.size), "unsolved": unsolved}
+
+
+def run_roster(roster: list, out_dir: str = "roster_logs",
+               shard_size: int = 500, workers: int | None = None,
+               progress=print) -> list:
+    """
+    Plan and expand every athlete, one shard per task, across processes.
+
+    Returns the per-shard summaries sorted by shard number.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    shards = [roster[i:i + shard_size] for i in range(0, len(roster), shard_size)]
+
+    t0 = time.perf_counter()
+    done_athletes = done_rows = 0
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, i, users, out_dir) for i, users in enumerate(shards)]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            done_athletes += res["athletes"]
+            done_rows     += res["rows"]
+            elapsed = time.perf_counter() - t0
+            if progress:
+                progress(f"  [{len(results):4d}/{len(shards)}] "
+                         f"{done_athletes:,}/{len(roster):,} athletes  "
+                         f"{done_rows:,} rows  "
+                         f"{done_athletes / elapsed:,.0f} athletes/s  "
+                         f"{done_rows / elapsed:,.0f} rows/s")
+
+    return sorted(results, key=lambda r: r["shard"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan and expand a roster of athletes.")
+    parser.add_argument("roster", help="CSV or JSON file of athlete profiles")
+    parser.add_argument("--out-dir", default="roster_logs")
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    SEP = "=" * 64
+    roster = load_roster(args.roster)
+    print(SEP)
+    print(f"  ROSTER  -  {len(roster):,} athlete(s) from {args.roster}")
+    print(SEP)
+
+    t0      = time.perf_counter()
+    results = run_roster(roster, args.out_dir, args.shard_size, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    unsolved = [a for r in results for a in r["unsolved"]]
+    rows     = sum(r["rows"] for r in results)
+    print(f"\n[OUTPUT]  {rows:,} entries in {len(results)} shard(s) -> {args.out_dir}/"
+          f"  ({elapsed:.2f} s)")
+    if unsolved:
+        print(f"[WARNING] No valid plan for {len(unsolved)} athlete(s): {unsolved[:10]}")
+    print(SEP)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+strips_search.py  -  Bitset STRIPS Search Engine
+=================================================
+Heuristic search over ground STRIPS tasks for the gym planner.
+
+Actions use the same dict format as `planning._STRIPS_ACTIONS`
+("name", "pre", "neg_pre", "add", "del" and an optional numeric "cost").
+They are compiled once into a `BitsetTask`, where every state is a single
+Python int with one bit per ground atom, so applicability checks and
+successor generation are a handful of integer AND/OR operations instead of
+frozenset algebra.
+
+Search keeps one parent pointer per state instead of copying the plan on
+every expansion, and actions are indexed by their first positive
+precondition so only actions that can possibly fire are tested.
+
+Heuristics (all computed on the delete relaxation, ignoring negative
+preconditions):
+    blind  - always 0 (uniform-cost search)
+    hmax   - admissible max-cost reachability
+    hadd   - additive cost, usually more informed but inadmissible
+    hff    - cost of an FF-style relaxed plan extracted from h_add supporters
+
+Usage:
+    python strips_search.py        # compare BFS and A* on the gym domain
+"""
+
+import heapq
+import time
+from itertools import count
+
+INF = float("inf")
+
+HEURISTICS = ("blind", "hmax", "hadd", "hff")
+
+
+def _bits(mask: int):
+    """Yield the index of every set bit in `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitsetTask:
+    """A ground STRIPS action set compiled to integer bitmasks."""
+
+    def __init__(self, actions: list, atoms=(), costs=None):
+        atom_set = set(atoms)
+        for action in actions:
+            atom_set |= action["pre"] | action["neg_pre"] | action["add"] | action["del"]
+
+        self.atoms      = sorted(atom_set)
+        self.atom_index = {atom: i for i, atom in enumerate(self.atoms)}
+
+        self.names     = [a["name"] for a in actions]
+        self.costs     = list(costs) if costs is not None else [a.get("cost", 1) for a in actions]
+        self.pre_mask  = [self.encode(a["pre"]) for a in actions]
+        self.neg_mask  = [self.encode(a["neg_pre"]) for a in actions]
+        self.add_mask  = [self.encode(a["add"]) for a in actions]
+        self.del_mask  = [self.encode(a["del"]) for a in actions]
+        self.pre_atoms = [list(_bits(m)) for m in self.pre_mask]
+        self.add_atoms = [list(_bits(m)) for m in self.add_mask]
+
+        # Successor index: each action lives under its lowest positive
+        # precondition, so it is tested at most once per expanded state.
+        self.by_first_pre = [[] for _ in self.atoms]
+        self.no_pre       = []
+        # Relaxation index: every action listed under each of its preconditions.
+        self.pre_of = [[] for _ in self.atoms]
+
+        for ai, atoms_needed in enumerate(self.pre_atoms):
+            if atoms_needed:
+                self.by_first_pre[atoms_needed[0]].append(ai)
+            else:
+                self.no_pre.append(ai)
+            for i in atoms_needed:
+                self.pre_of[i].append(ai)
+
+    # ── Encoding ────────────────────────────────────────────────────────
+
+    def encode(self, atoms) -> int:
+        """Pack known atoms into a bitmask; atoms no action mentions are dropped."""
+        mask = 0
+        for atom in atoms:
+            i = self.atom_index.get(atom)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def decode(self, mask: int) -> frozenset:
+        """Inverse of `encode`."""
+        return frozenset(self.atoms[i] for i in _bits(mask))
+
+    # ── Successors ──────────────────────────────────────────────────────
+
+    def applicable(self, state: int):
+        """Yield indices of actions whose preconditions hold in `state`."""
+        pre, neg = self.pre_mask, self.neg_mask
+        for i in _bits(state):
+            for ai in self.by_first_pre[i]:
+                if state & pre[ai] == pre[ai] and not state & neg[ai]:
+                    yield ai
+        for ai in self.no_pre:
+            if not state & neg[ai]:
+                yield ai
+
+    def successors(self, state: int):
+        """Yield (action_index, next_state) pairs for `state`."""
+        for ai in self.applicable(state):
+            yield ai, (state | self.add_mask[ai]) & ~self.del_mask[ai]
+
+    # ── Delete-relaxation heuristics ────────────────────────────────────
+
+    def _relaxed_costs(self, state: int, goal: int, use_max: bool):
+        """
+        Generalised Dijkstra over the delete relaxation.
+
+        Returns (atom_costs, best_supporter); exploration stops as soon as
+        every goal atom has been settled.
+        """
+        atom_cost = [INF] * len(self.atoms)
+        supporter = [-1] * len(self.atoms)
+        remaining = [len(p) for p in self.pre_atoms]
+        pre_cost  = [0] * len(self.pre_atoms)
+        heap      = []
+
+        for i in _bits(state):
+            atom_cost[i] = 0
+            heap.append((0, i))
+
+        def fire(ai, base):
+            new_cost = base + self.costs[ai]
+            for j in self.add_atoms[ai]:
+                if new_cost < atom_cost[j]:
+                    atom_cost[j] = new_cost
+                    supporter[j] = ai
+                    heapq.heappush(heap, (new_cost, j))
+
+        for ai in self.no_pre:
+            fire(ai, 0)
+
+        goals_left = goal & ~state
+        while heap and goals_left:
+            cost, i = heapq.heappop(heap)
+            if cost > atom_cost[i]:
+                continue
+            goals_left &= ~(1 << i)
+            for ai in self.pre_of[i]:
+                remaining[ai] -= 1
+                pre_cost[ai] = max(pre_cost[ai], cost) if use_max else pre_cost[ai] + cost
+                if remaining[ai] == 0:
+                    fire(ai, pre_cost[ai])
+
+        return atom_cost, supporter
+
+    def h_max(self, state: int, goal: int) -> float:
+        atom_cost, _ = self._relaxed_costs(state, goal, use_max=True)
+        return max((atom_cost[i] for i in _bits(goal)), default=0)
+
+    def h_add(self, state: int, goal: int) -> float:
+        atom_cost, _ = self._relaxed_costs(state, goal, use_max=False)
+        return sum(atom_cost[i] for i in _bits(goal))
+
+    def h_ff(self, state: int, goal: int) -> float:
+        atom_cost, supporter = self._relaxed_costs(state, goal, use_max=False)
+        relaxed_plan = set()
+        stack        = list(_bits(goal & ~state))
+        seen         = state
+        while stack:
+            i = stack.pop()
+            if atom_cost[i] == INF:
+                return INF
+            ai = supporter[i]
+            if ai in relaxed_plan:
+                continue
+            relaxed_plan.add(ai)
+            for j in self.pre_atoms[ai]:
+                if not seen >> j & 1:
+                    seen |= 1 << j
+                    stack.append(j)
+        return sum(self.costs[ai] for ai in relaxed_plan)
+
+    def heuristic(self, name: str):
+        """Return a callable h(state, goal) for one of HEURISTICS."""
+        if name == "blind":
+            return lambda state, goal: 0
+        if name == "hmax":
+            return self.h_max
+        if name == "hadd":
+            return self.h_add
+        if name == "hff":
+            return self.h_ff
+        raise ValueError(f"Unknown heuristic {name!r}; expected one of {HEURISTICS}")
+
+
+def _resolve(task: BitsetTask, init_atoms, goal_atoms):
+    """Encode init/goal, or return None if a goal atom can never become true."""
+    init_atoms = set(init_atoms)
+    goal_atoms = set(goal_atoms)
+    if any(g not in task.atom_index and g not in init_atoms for g in goal_atoms):
+        return None
+    return task.encode(init_atoms), task.encode(goal_atoms)
+
+
+def _extract_plan(task: BitsetTask, parent: dict, state: int) -> list:
+    plan = []
+    while parent[state] is not None:
+        state, ai = parent[state]
+        plan.append(task.names[ai])
+    plan.reverse()
+    return plan
+
+
+def astar(task: BitsetTask, init_atoms, goal_atoms,
+          heuristic: str = "hff", weight: float = 1.0,
+          bound: float = INF, stats: dict | None = None) -> list | None:
+    """
+    A* / weighted A* over a compiled STRIPS task.
+
+    The goal test happens when a state is popped, so with weight 1.0 and an
+    admissible heuristic ("blind" or "hmax") the returned plan is
+    cost-optimal; weight > 1 trades optimality (at most `weight` times the
+    optimum) for fewer expansions.
+
+    Parameters
+    ----------
+    task       : BitsetTask
+    init_atoms : iterable of str   – ground atoms true in the initial state
+    goal_atoms : iterable of str   – ground atoms that must be true in goal state
+    heuristic  : str               – one of HEURISTICS
+    weight     : float             – f = g + weight * h  (1.0 = plain A*)
+    bound      : float             – prune nodes whose g + h exceeds this cost;
+                                     only safe with an admissible heuristic
+    stats      : dict, optional    – filled with search counters:
+                 expanded, generated, evaluated, plan_cost, time_s
+
+    Returns
+    -------
+    list of action-name strings (the plan), or None if unsolvable.
+    """
+    t0       = time.perf_counter()
+    counters = {"expanded": 0, "generated": 0, "evaluated": 0, "plan_cost": None}
+    h        = task.heuristic(heuristic)
+    plan     = None
+
+    resolved = _resolve(task, init_atoms, goal_atoms)
+    if resolved is not None:
+        init, goal = resolved
+        tie        = count()
+        best_g     = {init: 0}
+        parent     = {init: None}
+        h0         = h(init, goal)
+        counters["evaluated"] += 1
+        open_list  = [(weight * h0, h0, next(tie), 0, init)] if h0 < INF and h0 <= bound else []
+
+        while open_list:
+            _, _, _, g, state = heapq.heappop(open_list)
+            if g > best_g[state]:
+                continue    # stale entry, a cheaper path was found later
+            if state & goal == goal:
+                plan = _extract_plan(task, parent, state)
+                counters["plan_cost"] = g
+                break
+            counters["expanded"] += 1
+            for ai, nxt in task.successors(state):
+                counters["generated"] += 1
+                new_g = g + task.costs[ai]
+                if new_g >= best_g.get(nxt, INF):
+                    continue
+                h_val = h(nxt, goal)
+                counters["evaluated"] += 1
+                if h_val == INF or new_g + h_val > bound:
+                    continue    # dead end, or cannot beat the cost bound
+                best_g[nxt] = new_g
+                parent[nxt] = (state, ai)
+                heapq.heappush(open_list, (new_g + weight * h_val, h_val, next(tie), new_g, nxt))
+
+    counters["time_s"] = time.perf_counter() - t0
+    if stats is not None:
+        stats.update(counters)
+    return plan
+
+
+def _chain_domain(n_lifts: int, n_phases: int) -> list:
+    """Synthetic per-lift block chains used to benchmark the search engines."""
+    actions = []
+    for lift in range(n_lifts):
+        for phase in range(n_phases):
+            done = f"lift{lift}-phase{phase}-built"
+            pre  = {f"lift{lift}-phase{phase - 1}-built"} if phase else set()
+            actions.append({
+                "name":    f"do-lift{lift}-phase{phase}-block",
+                "pre":     frozenset(pre),
+                "neg_pre": frozenset({done}),
+                "add":     frozenset({done}),
+                "del":     frozenset(),
+            })
+    return actions
+
+
+def main():
+    import planning
+
+    SEP = "=" * 64
+    print(SEP)
+    print("  BFS vs bitset A*  -  node expansions and wall time")
+    print(SEP)
+
+    domains = [("gym-planner", planning._STRIPS_ACTIONS, {"goal-reached"})]
+    for n_lifts, n_phases in [(3, 4), (4, 5)]:
+        actions = _chain_domain(n_lifts, n_phases)
+        goal    = {f"lift{l}-phase{n_phases - 1}-built" for l in range(n_lifts)}
+        domains.append((f"chain-{n_lifts}x{n_phases}", actions, goal))
+
+    for label, actions, goal in domains:
+        print(f"\n[{label}]  {len(actions)} actions")
+        bfs_stats: dict = {}
+        plan = planning.bfs_planner(set(), goal, actions=actions, stats=bfs_stats)
+        print(f'  {"bfs":6s}  plan={len(plan):3d}  expanded={bfs_stats["expanded"]:7d}'
+              f'  time={bfs_stats["time_s"] * 1000:8.2f} ms')
+        task = BitsetTask(actions)
+        for name in HEURISTICS:
+            stats: dict = {}
+            plan = astar(task, set(), goal, heuristic=name, stats=stats)
+            print(f'  {name:6s}  plan={len(plan):3d}  expanded={stats["expanded"]:7d}'
+                  f'  time={stats["time_s"] * 1000:8.2f} ms')
+    print(SEP)
+
+
+if __name__ == "__main__":
+    main()